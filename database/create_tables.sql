@@ -78,10 +78,146 @@ create table if not exists cards (
 	types                   TEXT,
 	uuid                    VARCHAR(36) NOT NULL,
 	variations              TEXT,
-	watermark               TEXT
+	watermark               TEXT,
+	content_hash            TEXT,       -- md5 of the loaded row, used by incremental syncs
+
+	-- WUBRG bitmasks (W=1, U=2, B=4, R=8, G=16), computed by PostgreSQL when a row is loaded.
+	-- Hybrid and Phyrexian symbols count for each of their colors. Every shift is parenthesized:
+	-- | and << have the same precedence and group left to right.
+	color_identity_mask     SMALLINT GENERATED ALWAYS AS (
+		  (coalesce(colorIdentity, '') LIKE '%W%')::int
+		| ((coalesce(colorIdentity, '') LIKE '%U%')::int << 1)
+		| ((coalesce(colorIdentity, '') LIKE '%B%')::int << 2)
+		| ((coalesce(colorIdentity, '') LIKE '%R%')::int << 3)
+		| ((coalesce(colorIdentity, '') LIKE '%G%')::int << 4)
+	) STORED,
+	mana_cost_mask          SMALLINT GENERATED ALWAYS AS (
+		  (coalesce(manaCost, '') LIKE '%W%')::int
+		| ((coalesce(manaCost, '') LIKE '%U%')::int << 1)
+		| ((coalesce(manaCost, '') LIKE '%B%')::int << 2)
+		| ((coalesce(manaCost, '') LIKE '%R%')::int << 3)
+		| ((coalesce(manaCost, '') LIKE '%G%')::int << 4)
+	) STORED
+);
+
+-- One row per printing; also the conflict target of incremental syncs
+CREATE UNIQUE INDEX cards_uuid ON cards(uuid);
+
+-- One row per AllPrintings load (parsing/parse_mtg_data.py)
+create table if not exists catalog_sync (
+	sync_id                 SERIAL PRIMARY KEY,
+	source_version          TEXT,       -- MTGJSON meta.version
+	source_date             DATE,       -- MTGJSON meta.date
+	mode                    TEXT NOT NULL,  -- 'full' or 'incremental'
+	rows_inserted           INTEGER NOT NULL DEFAULT 0,
+	rows_updated            INTEGER NOT NULL DEFAULT 0,
+	synced_at               TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Printings of a card by name (e.g. all printings of one oracle card)
+CREATE INDEX cards_lower_name_language ON cards(lower(name), language);
+
+-- One canonical English printing per card name: what every search and lookup reads.
+-- Refreshed by parsing/parse_mtg_data.py after each load.
+CREATE MATERIALIZED VIEW IF NOT EXISTS oracle_cards AS
+SELECT DISTINCT ON (name)
+	name,
+	colorIdentity,
+	colorIndicator,
+	flavorText,
+	keywords,
+	leadershipSkills,
+	manaCost,
+	manaValue,
+	originalType,
+	power,
+	rarity,
+	subtypes,
+	supertypes,
+	text,
+	toughness,
+	types,
+	id,
+	uuid,
+	color_identity_mask,
+	mana_cost_mask
+FROM cards
+WHERE language = 'English'
+ORDER BY name, id;
+
+-- Unique index: required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX oracle_cards_name ON oracle_cards(name);
+CREATE UNIQUE INDEX oracle_cards_uuid ON oracle_cards(uuid);
+
+-- Exact, case-insensitive name lookups (DBManager.get_card_by_name)
+CREATE INDEX oracle_cards_lower_name ON oracle_cards(lower(name));
+
+-- Color filters probe these with "mask = ANY(<every subset of the allowed colors>)"
+CREATE INDEX oracle_cards_color_identity_mask ON oracle_cards(color_identity_mask);
+CREATE INDEX oracle_cards_mana_cost_mask ON oracle_cards(mana_cost_mask);
+
+-- Substring (ILIKE '%...%') and fuzzy search on name / rules text / subtypes
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX oracle_cards_name_trgm ON oracle_cards USING gin (name gin_trgm_ops);
+CREATE INDEX oracle_cards_text_trgm ON oracle_cards USING gin (text gin_trgm_ops);
+CREATE INDEX oracle_cards_subtypes_trgm ON oracle_cards USING gin (subtypes gin_trgm_ops);
+
+-- Ranked full-text search on rules text (DBManager.find_cards)
+CREATE INDEX oracle_cards_text_fts ON oracle_cards USING gin (to_tsvector('english', coalesce(text, '')));
+
+-- Decks per user (frontend/decks.py, PostgresDeckStore; enabled with DECK_STORE=postgres).
+-- Follows the tbl_decks / tbl_deck_cards sketch below, keyed by the app's username.
+create table if not exists decks (
+	deck_id                 SERIAL PRIMARY KEY,
+	username                TEXT NOT NULL,
+	deck_name               TEXT NOT NULL,
+	favorite                BOOLEAN NOT NULL DEFAULT FALSE,
+	updated_at              TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+	UNIQUE (username, deck_name)
 );
 
-CREATE INDEX cards_uuid ON cards(uuid);
+-- One row per distinct card of a deck's main deck, and one per commander: a card can be both,
+-- kept apart like "cards" and "commander" in the JSON decks. Cards are referenced by uuid, not
+-- cards.id: ids are reassigned on every full reload. No foreign key to cards for the same
+-- reason: a full reload deletes every row.
+create table if not exists deck_cards (
+	deck_id                 INTEGER NOT NULL REFERENCES decks(deck_id) ON DELETE CASCADE,
+	card_uuid               TEXT NOT NULL,
+	quantity                INTEGER NOT NULL DEFAULT 1 CHECK (quantity > 0),
+	is_commander            BOOLEAN NOT NULL DEFAULT FALSE,
+	PRIMARY KEY (deck_id, card_uuid, is_commander)
+);
+
+-- Price history per printing (parsing/parse_mtg_prices.py, from MTGJSON AllPrices).
+-- Keyed by card uuid like deck_cards, so decks are priced with a join on what they store.
+-- Partitioned by month (card_prices_yYYYYmMM, created by the importer as data arrives), so
+-- date-bounded queries only touch the months they need and retention drops whole partitions.
+create table if not exists card_prices (
+	uuid                    TEXT NOT NULL,
+	vendor                  TEXT NOT NULL,      -- e.g. 'tcgplayer', 'cardmarket', 'cardkingdom'
+	finish                  TEXT NOT NULL,      -- 'normal', 'foil' or 'etched'
+	price_date              DATE NOT NULL,
+	price                   NUMERIC(10, 2) NOT NULL,
+	currency                TEXT NOT NULL DEFAULT 'USD',
+	-- Also serves a printing's history: (uuid, vendor, finish) then a date range
+	PRIMARY KEY (uuid, vendor, finish, price_date)
+) PARTITION BY RANGE (price_date);
+
+-- Rows arrive in date order, so a BRIN index (a few pages per partition) covers
+-- whole-market date range scans
+CREATE INDEX card_prices_date_brin ON card_prices USING brin (price_date);
+
+-- Latest price per printing, vendor and finish; maintained by the importer.
+-- Current deck values read this instead of searching the history.
+create table if not exists card_prices_current (
+	uuid                    TEXT NOT NULL,
+	vendor                  TEXT NOT NULL,
+	finish                  TEXT NOT NULL,
+	price_date              DATE NOT NULL,
+	price                   NUMERIC(10, 2) NOT NULL,
+	currency                TEXT NOT NULL DEFAULT 'USD',
+	PRIMARY KEY (uuid, vendor, finish)
+);
 
 
 -- create table if not exists tbl_cards(
@@ -0,0 +1,155 @@
+import threading
+from collections import Counter, OrderedDict
+from typing import Callable, Hashable, NamedTuple
+from filters import COLORS, color_identity
+from mana import parse_mana_cost
+
+# Deck sections in display order; a card goes in the first one matching its types
+TAG_ORDER = [
+    "commander", "artifact", "battle", "conspiracy", "creature", "dungeon",
+    "enchantment", "instant", "kindred", "land", "phenomenon", "plane",
+    "planeswalker", "scheme", "sorcery", "vanguard"
+]
+_TAGS = set(TAG_ORDER)
+
+# Mana values from this one up share the last curve bucket ("7+")
+CURVE_MAX = 7
+
+
+class DeckSummary(NamedTuple):
+    """
+    Everything the deck page and deck list show about a deck's contents, computed once per revision.
+
+    Attributes
+    ----------
+    commanders : list[dict]
+        Commander cards.
+    groups : dict[str, list[tuple[dict, int]]]
+        ``(card, quantity)`` per TAG_ORDER section, sorted by mana value; only non-empty sections.
+    type_counts : dict[str, int]
+        Number of cards (copies included) per section.
+    curve : dict[int, int]
+        Non-land cards per mana value 0 .. CURVE_MAX (the last bucket holds CURVE_MAX and up).
+    pips : dict[str, int]
+        Colored mana symbols per color (W/U/B/R/G) over all mana costs, copies included;
+        hybrid and Phyrexian symbols count for each of their colors.
+    colors : frozenset[str]
+        Union of the commanders' color identities.
+    card_count : int
+        Number of cards, commanders included.
+    land_count : int
+        Number of lands.
+    average_mana_value : float
+        Average mana value of the non-land cards (0 if there are none).
+    """
+
+    commanders: list
+    groups: dict
+    type_counts: dict
+    curve: dict
+    pips: dict
+    colors: frozenset
+    card_count: int
+    land_count: int
+    average_mana_value: float
+
+
+def card_types(card) -> set:
+    """Lowercased card types (e.g. "Artifact, Creature" -> {"artifact", "creature"})."""
+    types = card.get("types") or ""
+    if isinstance(types, str):
+        types = types.split(",")
+    return {t.strip().lower() for t in types}
+
+
+def card_tag(card, commander_names=()) -> str:
+    """Deck section of a card: "commander", the first TAG_ORDER type it has, or "other"."""
+    if card.get("name", "") in commander_names:
+        return "commander"
+    types = card_types(card) & _TAGS
+    return next((tag for tag in TAG_ORDER if tag in types), "other")
+
+
+def mana_value(card) -> float:
+    return card.get("cmc") or card.get("manavalue") or 0
+
+
+def summarize_deck(commanders: list, cards: list) -> DeckSummary:
+    """Build the summary of a deck from its commanders and ``(card, quantity)`` pairs."""
+    commander_names = {c.get("name") for c in commanders}
+    groups: dict[str, list] = {}
+    curve = dict.fromkeys(range(CURVE_MAX + 1), 0)
+    pips = Counter()
+    colors = set()
+    land_count = nonland_count = 0
+    nonland_mana_value = 0.0
+
+    entries = [(card, 1) for card in commanders] + list(cards)
+    for card, quantity in entries:
+        groups.setdefault(card_tag(card, commander_names), []).append((card, quantity))
+
+        for symbol in parse_mana_cost(card.get("manacost")).symbols:
+            for color in symbol.upper().split("/"):
+                if color in COLORS:
+                    pips[color] += quantity
+
+        if "land" in card_types(card):
+            land_count += quantity
+        else:
+            value = mana_value(card)
+            curve[min(int(value), CURVE_MAX)] += quantity
+            nonland_count += quantity
+            nonland_mana_value += value * quantity
+
+    for commander in commanders:
+        colors |= color_identity(commander)
+
+    groups = {tag: sorted(groups[tag], key=lambda entry: mana_value(entry[0]))
+              for tag in TAG_ORDER if tag in groups}
+    return DeckSummary(
+        commanders=list(commanders),
+        groups=groups,
+        type_counts={tag: sum(quantity for _, quantity in group) for tag, group in groups.items()},
+        curve=curve,
+        pips={color: pips[color] for color in COLORS if pips[color]},
+        colors=frozenset(colors),
+        card_count=sum(quantity for _, quantity in entries),
+        land_count=land_count,
+        average_mana_value=nonland_mana_value / nonland_count if nonland_count else 0.0,
+    )
+
+
+class SummaryCache:
+    """
+    Bounded cache of deck summaries, keyed by deck and invalidated by revision.
+
+    A summary is rebuilt only when the revision passed in (e.g. the deck's ``updated_at``)
+    differs from the one it was built for; the least recently used decks are evicted
+    beyond ``maxsize``.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Number of decks kept (default is 512).
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, revision: Hashable, build: Callable[[], DeckSummary]) -> DeckSummary:
+        """Return the summary of ``key`` at ``revision``, calling ``build`` only if it is not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == revision:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        summary = build()
+        with self._lock:
+            self._entries[key] = (revision, summary)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return summary
@@ -1,6 +1,12 @@
-from shiny import App
-from ui import app_ui           # 💬 The layout of your app (login screen, register screen, etc.)
-from logic import server        # 💬 The logic handling user actions like login, logout, etc.
+import startup                  # ⏱️ Startup timing + background warm-up (imported first so it sees everything)
+
+with startup.timed("import shiny"):
+    from shiny import App
+with startup.timed("import ui"):
+    from ui import app_ui       # 💬 The layout of your app (login screen, register screen, etc.)
+with startup.timed("import logic"):
+    from logic import server    # 💬 The logic handling user actions like login, logout, etc.
+from utils import catalog, get_db  # 🗂️ Lazily connected DB + process-wide card catalog
 import pathlib                  # ✅ Needed to resolve relative icon folder path
 
 
@@ -16,3 +22,11 @@ if __name__ == "__main__":
     import sys
     sys.argv = ["shiny", "run", "--reload", __file__]
     main()
+else:
+    # 🗂️ Connect and load the card catalog in the background; logged-in views show a loading
+    # page until startup.ready is set.
+    # For a per-module breakdown of import time run: python -X importtime app.py
+    startup.warm_up(
+        ("connect database", get_db),
+        ("load card catalog", catalog.refresh),
+    )
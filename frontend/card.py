@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Optional
 from pydantic import BaseModel
 
@@ -83,6 +84,73 @@ class Card(BaseModel):
     variations: Optional[str] = None
     watermark: Optional[str] = None
 
+# Lower-case column name (as returned by PostgreSQL) -> Card field name
+_FIELD_BY_COLUMN = {name.lower(): name for name in Card.model_fields}
+
+
+def card_from_row(row) -> Card:
+    """Validate one database row (dict or CardRecord) into a Card; use at trust boundaries only."""
+    return Card(**{_FIELD_BY_COLUMN[key]: row[key] for key in row.keys() if key in _FIELD_BY_COLUMN})
+
+
+class CardRecord:
+    """
+    Lightweight, read-only card row for bulk paths (catalog, search results).
+
+    A record keeps the database row tuple as-is and shares one column index per query
+    shape, so it costs a fraction of a dict or a pydantic Card and needs no validation.
+    It reads like a dict (``record["name"]``, ``record.get("text")``, ``dict(record)``).
+    Build records with ``record_mapper(columns)``, not directly.
+    """
+
+    __slots__ = ("_row",)
+    _index: dict = {}
+
+    def __init__(self, row: tuple):
+        self._row = row
+
+    def __getitem__(self, key):
+        return self._row[self._index[key]]
+
+    def get(self, key, default=None):
+        index = self._index.get(key)
+        return default if index is None else self._row[index]
+
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+    def keys(self):
+        return self._index.keys()
+
+    def items(self):
+        return zip(self._index, self._row)
+
+    def to_dict(self) -> dict:
+        return dict(zip(self._index, self._row))
+
+    def __eq__(self, other):
+        if isinstance(other, CardRecord):
+            return self._index is other._index and self._row == other._row
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._row)
+
+    def __repr__(self):
+        return f"CardRecord({self.to_dict()!r})"
+
+
+@lru_cache(maxsize=None)
+def record_mapper(columns: tuple) -> type:
+    """
+    Return the row -> CardRecord mapper for a query's columns.
+
+    The mapper is a CardRecord subclass with the column index baked in, compiled once per
+    distinct column list: ``list(map(record_mapper(columns), rows))``.
+    """
+    return type("CardRecord", (CardRecord,), {"__slots__": (), "_index": {c: i for i, c in enumerate(columns)}})
+
+
 class Cards:
     def __init__(self):
         self.cards: list[Card] = []
@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+
+
+class CatalogSnapshot(NamedTuple):
+    """One loaded catalog: the cards, their lookup indexes and the version they belong to."""
+
+    cards: list
+    by_name: dict
+    by_uuid: dict
+    version: int
+
+
+class CardCatalog:
+    """
+    Process-wide in-memory cache of the card catalog (one row per card name).
+
+    The catalog is loaded once through ``loader`` and shared by every Shiny
+    session in the process. It is reloaded when ``refresh()`` is called
+    explicitly or when the cached copy is older than ``ttl`` seconds. Every
+    reload bumps ``version`` so callers can cheaply detect that their derived
+    data is stale.
+
+    Parameters
+    ----------
+    loader : Callable[[], list[dict]]
+        Function returning all card rows (e.g. ``DBManager.get_cards_by_name("")``).
+    ttl : float, optional
+        Maximum age of the cached catalog in seconds. ``None`` or ``0`` disables
+        time-based refreshes (default is ``CATALOG_TTL`` from the environment, or 3600).
+
+    Each load builds a new immutable ``CatalogSnapshot`` and publishes it with a single
+    reference swap, so a reader that takes ``snapshot()`` always sees cards, indexes and
+    version from the same load.
+
+    Attributes
+    ----------
+    version : int
+        Incremented on every successful load; 0 means "never loaded".
+    loaded_at : float | None
+        ``time.monotonic()`` timestamp of the last successful load.
+    """
+
+    def __init__(self, loader: Callable[[], list[dict]], ttl: Optional[float] = None):
+        self._loader = loader
+        self.ttl = float(os.environ.get("CATALOG_TTL", 3600)) if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._snapshot = CatalogSnapshot([], {}, {}, 0)
+        self.loaded_at: Optional[float] = None
+
+    def _is_stale(self) -> bool:
+        if self.loaded_at is None:
+            return True
+        return bool(self.ttl) and time.monotonic() - self.loaded_at > self.ttl
+
+    def _ensure_loaded(self) -> None:
+        if self._is_stale():
+            with self._lock:
+                # Another thread may have reloaded while we waited for the lock
+                if self._is_stale():
+                    self._load()
+
+    def _load(self) -> None:
+        cards = self._loader()
+        by_name = {}
+        for card in cards:
+            by_name.setdefault(card.get("name"), card)
+        by_uuid = {card.get("uuid"): card for card in cards}
+        # One reference swap: readers see either the old snapshot or the new one, never a mix
+        self._snapshot = CatalogSnapshot(cards, by_name, by_uuid, self._snapshot.version + 1)
+        self.loaded_at = time.monotonic()
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Return the current catalog, loading or refreshing it if needed."""
+        self._ensure_loaded()
+        return self._snapshot
+
+    def refresh(self) -> int:
+        """Reload the catalog now and return the new version."""
+        with self._lock:
+            self._load()
+            return self.version
+
+    def invalidate(self) -> None:
+        """Mark the catalog stale so the next access reloads it."""
+        self.loaded_at = None
+
+    def cards(self) -> list[dict]:
+        """Return all cached cards, loading or refreshing them if needed."""
+        return self.snapshot().cards
+
+    def get(self, name: str) -> Optional[dict]:
+        """Return the cached card with exactly this name, or None."""
+        return self.snapshot().by_name.get(name)
+
+    def get_by_uuid(self, uuid: str) -> Optional[dict]:
+        """Return the cached card with this uuid, or None (e.g. a printing other than the catalog's)."""
+        return self.snapshot().by_uuid.get(uuid)
+
+    def __len__(self) -> int:
+        return len(self.cards())
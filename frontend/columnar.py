@@ -0,0 +1,143 @@
+import re
+from filters import CardFilter
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; without it searches run in SQL
+    np = None
+
+# True when the columnar catalog can be used in this environment
+available = np is not None
+
+# Words of a name, as pg_trgm splits them
+_WORD = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: str) -> set:
+    """Trigrams of a string the way pg_trgm builds them (lowercased words padded with "  " and " ")."""
+    grams = set()
+    for word in _WORD.findall(text.lower()):
+        word = f"  {word} "
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+def similarity(a: str, b: str) -> float:
+    """pg_trgm ``similarity(a, b)``: shared trigrams over all trigrams of both strings."""
+    return _overlap(trigrams(a), trigrams(b))
+
+
+def _overlap(grams_a: set, grams_b: set) -> float:
+    shared = len(grams_a & grams_b)
+    total = len(grams_a) + len(grams_b) - shared
+    return shared / total if total else 0.0
+
+
+class ColumnarCatalog:
+    """
+    Column-oriented copy of a list of card rows with vectorized filtering.
+
+    Numeric properties (mana value, color bitmasks, a card-type bitmask) are stored as NumPy
+    arrays, so those parts of a CardFilter are a handful of boolean mask operations over the
+    whole catalog. Name, rules text and subtypes are kept as pre-lowercased Python strings
+    (NumPy's fixed-width string arrays would pad every row to the longest text) and tested
+    with plain ``in`` checks, only on the rows the numeric masks left.
+
+    Parameters
+    ----------
+    records : list[CardRecord]
+        Card rows, e.g. the distinct-name catalog or every printing.
+    version : int, optional
+        Version of the source the columns were built from (e.g. ``CardCatalog.version``).
+    """
+
+    def __init__(self, records, version: int = 0):
+        if np is None:
+            raise RuntimeError("ColumnarCatalog requires numpy")
+        self.records = list(records)
+        self.version = version
+        count = len(self.records)
+
+        # Every distinct card type gets its own bit
+        self.type_bits: dict[str, int] = {}
+
+        self.mana_value = np.fromiter(
+            (r.get("manavalue") or 0 for r in self.records), dtype=np.float32, count=count)
+        # Bitmasks precomputed by the database (cards.mana_cost_mask / color_identity_mask)
+        self.cost_colors = np.fromiter(
+            (r.get("mana_cost_mask") or 0 for r in self.records), dtype=np.uint8, count=count)
+        self.identity = np.fromiter(
+            (r.get("color_identity_mask") or 0 for r in self.records), dtype=np.uint8, count=count)
+        self.types = np.fromiter(
+            (self._type_mask(r.get("types")) for r in self.records), dtype=np.uint64, count=count)
+        self.name = [(r.get("name") or "").lower() for r in self.records]
+        self.text = [(r.get("text") or "").lower() for r in self.records]
+        self.subtypes = [(r.get("subtypes") or "").lower() for r in self.records]
+
+    def _type_mask(self, types) -> int:
+        mask = 0
+        for card_type in (types or "").lower().split(","):
+            card_type = card_type.strip()
+            if card_type:
+                bit = self.type_bits.setdefault(card_type, 1 << len(self.type_bits))
+                mask |= bit
+        return mask
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def mask(self, card_filter: CardFilter):
+        """Return a boolean array marking the rows that match the numeric parts of ``card_filter``."""
+        keep = np.ones(len(self.records), dtype=bool)
+
+        if card_filter.type:
+            bit = self.type_bits.get(card_filter.type.lower())
+            if bit is None:
+                keep[:] = False
+            else:
+                keep &= (self.types & np.uint64(bit)) != 0
+        if card_filter.excluded_colors:
+            keep &= (self.cost_colors & card_filter.excluded_mask) == 0
+        if card_filter.identity_mask is not None:
+            keep &= (self.identity & ~np.uint8(card_filter.identity_mask)) == 0
+        if card_filter.mana_min is not None:
+            keep &= self.mana_value >= card_filter.mana_min
+        if card_filter.mana_max is not None:
+            keep &= self.mana_value <= card_filter.mana_max
+        return keep
+
+    def matches(self, card_filter: CardFilter) -> list[int]:
+        """Return the indices of the rows matching ``card_filter``, in input order."""
+        rows = np.flatnonzero(self.mask(card_filter)).tolist()
+        checks = []
+        if card_filter.name:
+            checks.append((self.name, card_filter.name.lower()))
+        if card_filter.subtype:
+            checks.append((self.subtypes, card_filter.subtype.lower()))
+        if card_filter.text:
+            # Every word must occur (which the whole phrase implies); longest, rarest, first
+            words = sorted(set(card_filter.text.lower().split()), key=len, reverse=True)
+            checks.extend((self.text, word) for word in words)
+        for column, needle in checks:
+            rows = [i for i in rows if needle in column[i]]
+        return rows
+
+    def search(self, card_filter: CardFilter, limit: int | None = None, offset: int = 0) -> tuple[int, list]:
+        """
+        Return the total number of matches and the requested slice of matching rows.
+
+        Mirrors ``DBManager.find_cards`` except for the rules text: a card matches if its text
+        contains every word of the search (so also the whole phrase, the SQL ``ILIKE`` half),
+        which stands in for PostgreSQL's full-text match without its stemming and stop words
+        (e.g. "cards" does not match "card" here). Results are ordered like the SQL backend
+        (name similarity when a name is searched, then name, assuming rows come in name order),
+        but not by full-text relevance, so text searches may page differently.
+        """
+        rows = self.matches(card_filter)
+        if card_filter.name:
+            # Stable sort: rows with equal similarity keep their (name) order
+            query = trigrams(card_filter.name)
+            scores = {i: _overlap(trigrams(self.name[i]), query) for i in rows}
+            rows.sort(key=lambda i: -scores[i])
+        end = None if limit is None else offset + limit
+        return len(rows), [self.records[i] for i in rows[offset:end]]
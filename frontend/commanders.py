@@ -0,0 +1,83 @@
+import json
+from typing import Optional
+
+# Commander search stages (state.choose_commander_stage) and what each one offers
+STAGES = ("first", "partner", "background")
+
+
+def leadership_skills(card) -> Optional[dict]:
+    """MTGJSON ``leadershipSkills`` of a card (e.g. {"commander": true, ...}), or None if unknown."""
+    skills = card.get("leadershipskills")
+    if isinstance(skills, str):
+        try:
+            skills = json.loads(skills)
+        except ValueError:
+            return None
+    return skills if isinstance(skills, dict) else None
+
+
+def _has(field, value: str) -> bool:
+    return value in (field or "")
+
+
+def is_legal_commander(card) -> bool:
+    """True if the card can lead a Commander deck on its own."""
+    skills = leadership_skills(card)
+    if skills is not None:
+        return bool(skills.get("commander"))
+    # Card data loaded without leadershipSkills: legendary creatures and "can be your commander" walkers
+    return _has(card.get("supertypes"), "Legendary") and (
+        _has(card.get("types"), "Creature")
+        or (_has(card.get("types"), "Planeswalker") and "can be your commander" in (card.get("text") or "").lower())
+    )
+
+
+def is_partner(card) -> bool:
+    """True if the card is a legendary creature that can share the command zone (Partner and its variants)."""
+    return (_has(card.get("supertypes"), "Legendary") and _has(card.get("types"), "Creature")
+            and "partner" in ((card.get("keywords") or "") + " " + (card.get("text") or "")).lower())
+
+
+def is_background(card) -> bool:
+    """True if the card is a Background (a second commander for "Choose a Background" commanders)."""
+    return (_has(card.get("supertypes"), "Legendary") and _has(card.get("types"), "Enchantment")
+            and _has(card.get("subtypes"), "Background"))
+
+
+class CommanderIndex:
+    """
+    Commander-eligible cards of the catalog, grouped by commander search stage.
+
+    Built once per catalog version: eligibility is decided from ``leadershipSkills`` and type
+    data a single time per card, so a commander search only filters the few thousand eligible
+    cards by name instead of re-checking every card in the catalog.
+
+    Parameters
+    ----------
+    records : list[CardRecord]
+        Catalog rows (one per card name).
+    version : int, optional
+        Version of the source the index was built from (e.g. ``CardCatalog.version``).
+
+    Attributes
+    ----------
+    stages : dict[str, list[tuple[str, CardRecord]]]
+        ``(lowercased name, card)`` per stage ("first", "partner", "background"), in catalog order.
+    """
+
+    def __init__(self, records, version: int = 0):
+        self.version = version
+        self.stages: dict[str, list] = {stage: [] for stage in STAGES}
+        for card in records:
+            entry = ((card.get("name") or "").lower(), card)
+            if is_legal_commander(card):
+                self.stages["first"].append(entry)
+            if is_partner(card):
+                self.stages["partner"].append(entry)
+            if is_background(card):
+                self.stages["background"].append(entry)
+
+    def search(self, stage: str, name_filter: str = "") -> list:
+        """Return the candidates of a stage whose name contains ``name_filter`` (case-insensitive)."""
+        needle = name_filter.lower().strip()
+        return [card for name, card in self.stages.get(stage, ()) if needle in name]
@@ -1,13 +1,58 @@
+import asyncio
 import os
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import psycopg2
-from card import Card
+from psycopg2.pool import ThreadedConnectionPool
+from card import Card, CardRecord, card_from_row, record_mapper
+from filters import CardFilter, subset_masks
+from prices import DeckPriceRange, DeckValue, PrintingPrice
+
+# Columns returned by the search and lookup queries
+SUMMARY_COLUMNS = """
+                    name,
+                    colorIdentity,
+                    colorIndicator,
+                    flavorText,
+                    keywords,
+                    leadershipSkills,
+                    manaCost,
+                    manavalue,
+                    originalType,
+                    power,
+                    rarity,
+                    subtypes,
+                    supertypes,
+                    text,
+                    toughness,
+                    types,
+                    id,
+                    uuid,
+                    color_identity_mask,
+                    mana_cost_mask"""
+
+def _deck_arrays(decks: dict) -> tuple[list, list, list]:
+    """Flatten ``{key: {uuid: quantity}}`` into parallel key / uuid / quantity arrays (for unnest)."""
+    keys, uuids, quantities = [], [], []
+    for key, cards in decks.items():
+        for uuid, quantity in cards.items():
+            keys.append(key)
+            uuids.append(uuid)
+            quantities.append(quantity)
+    return keys, uuids, quantities
+
 
 class DBManager:
     """
     Database manager for interacting with a PostgreSQL database containing card information.
 
     Provides methods to retrieve all cards, selected card data, and cards matching a given name
-    from the 'cards' table. Handles database connection and cleanup.
+    from the 'cards' table. Queries run on connections borrowed from a bounded, thread-safe
+    pool, so concurrent sessions do not queue behind each other on a single socket.
 
     Parameters
     ----------
@@ -21,46 +66,155 @@ class DBManager:
         Host address of the PostgreSQL server (default is 'localhost').
     port : str, optional
         Port number for the PostgreSQL server (default is '5432').
+    minconn : int, optional
+        Connections opened up front and kept in the pool (default is 1).
+    maxconn : int, optional
+        Upper bound on simultaneously open connections; callers beyond it wait for a
+        free connection (default is 10).
+    health_check_interval : float, optional
+        Connections idle for longer than this many seconds are pinged with ``SELECT 1``
+        before being handed out (default is 30).
 
     Attributes
     ----------
-    conn : psycopg2.extensions.connection
-        Active connection to the PostgreSQL database.
+    pool : psycopg2.pool.ThreadedConnectionPool
+        Pool of autocommit connections to the PostgreSQL database.
 
     Methods
     -------
-    get_all_cards() -> list[Card]
-        Retrieve all card records and return them as a list of `Card` objects.
-    get_selected_card_data() -> list[dict]
-        Retrieve selected fields for all cards as a list of dictionaries.
-    get_cards_by_name(text: str) -> list[dict]
-        Retrieve card records matching a given name (case-insensitive, English only).
+    get_all_cards(validate: bool) -> list[CardRecord] | list[Card]
+        Retrieve all card records, as lightweight `CardRecord` rows or, with ``validate``,
+        as validated `Card` objects.
+    get_selected_card_data() -> list[CardRecord]
+        Retrieve selected fields for all cards.
+    get_cards_by_name(text: str) -> list[CardRecord]
+        Retrieve oracle cards whose name contains the given text (case-insensitive).
+    get_card_by_name(name: str) -> CardRecord | None
+        Retrieve the oracle card with exactly this name (case-insensitive), using
+        the ``oracle_cards_lower_name`` index.
+    get_cards_by_uuid(uuids: list[str]) -> list[CardRecord]
+        Retrieve the printings with these uuids in one query (any printing, not only oracle cards).
+    get_deck_values(decks: dict, vendor: str, finish: str) -> dict[str, DeckValue]
+        Price many decks (``{key: {uuid: quantity}}``) at a vendor's latest prices in one query.
+    get_deck_value_history(decks: dict, vendor: str, finish: str, since: date, bucket: str) -> dict
+        Value many decks per day / week / month from the partitioned price history.
+    get_deck_price_range(cards: dict, vendors: list[str], finishes: tuple) -> DeckPriceRange
+        Cheapest printing of every deck card and the min / max deck total, in one query.
+    find_cards(card_filter: CardFilter, limit: int | None, offset: int) -> list[CardRecord]
+        Retrieve oracle cards matching a structured filter, ranked by
+        relevance, one page at a time.
+    count_cards(card_filter: CardFilter) -> int
+        Count the card names matching a structured filter (for pagination).
+    search_cards(name: str, text: str) -> list[CardRecord]
+        Shortcut for ``find_cards`` filtering on name and rules text only.
+    connection()
+        Context manager lending a pooled, health-checked connection.
+    cursor()
+        Context manager yielding a cursor on a pooled connection.
     close()
-        Close the database connection.
+        Close all pooled connections.
     """
 
-    def __init__(self, dbname, user, password, host='localhost', port='5432'):
-        self.conn = psycopg2.connect(
+    # Errors meaning the connection itself is unusable and should be replaced
+    CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+    # An OperationalError too, but the connection is fine and rerunning the query would time out again
+    QUERY_CANCELED = psycopg2.extensions.QueryCanceledError
+
+    def __init__(self, dbname, user, password, host='localhost', port='5432',
+                 minconn=1, maxconn=10, health_check_interval=30.0):
+        self.pool = ThreadedConnectionPool(
+            minconn,
+            maxconn,
             dbname=dbname,
             user=user,
             password=password,
             host=host,
             port=port
         )
-        self.conn.autocommit = True
-
-    def get_all_cards(self) -> list[Card]:
-        with self.conn.cursor() as cur:
-            cur.execute("SELECT * FROM cards;")
-            columns = [desc[0] for desc in cur.description]
-            rows = cur.fetchall()
-            cards = []
-            for row in rows:
-                data = dict(zip(columns, row))
-                cards.append(Card(**data))
-            return cards
-
-    def get_selected_card_data(self) -> list[dict]:
+        self.health_check_interval = health_check_interval
+        # getconn() raises instead of waiting when the pool is exhausted
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._last_used: dict[int, float] = {}
+
+    def _is_healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        # Never handed out before (just opened) or used recently enough to trust
+        if last_used is None or time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            return True
+        except self.CONNECTION_ERRORS:
+            return False
+
+    def _discard(self, conn) -> None:
+        self._last_used.pop(id(conn), None)
+        self.pool.putconn(conn, close=True)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a healthy autocommit connection from the pool, reconnecting if needed."""
+        self._slots.acquire()
+        try:
+            conn = self.pool.getconn()
+            if not self._is_healthy(conn):
+                self._discard(conn)
+                conn = self.pool.getconn()
+            conn.autocommit = True
+            try:
+                yield conn
+            except self.QUERY_CANCELED:
+                self.pool.putconn(conn)
+                raise
+            except self.CONNECTION_ERRORS:
+                self._discard(conn)
+                raise
+            except BaseException:
+                self.pool.putconn(conn)
+                raise
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+                self.pool.putconn(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def cursor(self):
+        """Yield a cursor on a pooled connection."""
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                yield cur
+
+    def _fetch_all(self, query, params=None, records=False) -> list:
+        """
+        Run a read-only query, retrying once on a dropped connection (not on a statement timeout).
+
+        Rows come back as dicts, or as CardRecords when ``records`` is true (bulk card reads).
+        """
+        for attempt in range(2):
+            try:
+                with self.cursor() as cur:
+                    cur.execute(query, params)
+                    columns = tuple(desc[0] for desc in cur.description)
+                    rows = cur.fetchall()
+                    if records:
+                        return list(map(record_mapper(columns), rows))
+                    return [dict(zip(columns, row)) for row in rows]
+            except self.QUERY_CANCELED:
+                raise
+            except self.CONNECTION_ERRORS:
+                if attempt:
+                    raise
+
+    def get_all_cards(self, validate: bool = False) -> list[CardRecord] | list[Card]:
+        rows = self._fetch_all("SELECT * FROM cards;", records=True)
+        # Pydantic validation is opt-in: it costs more than the query itself on the full table
+        return [card_from_row(row) for row in rows] if validate else rows
+
+    def get_selected_card_data(self) -> list[CardRecord]:
         query = """
                 SELECT
                     name,
@@ -82,46 +236,319 @@ class DBManager:
                     uuid
                 FROM cards; \
                 """
-        with self.conn.cursor() as cur:
-            cur.execute(query)
-            columns = [desc[0] for desc in cur.description]
-            rows = cur.fetchall()
-            return [dict(zip(columns, row)) for row in rows]
+        return self._fetch_all(query, records=True)
 
-    def get_cards_by_name(self, text: str) -> list[dict]:
-        query = """
-                SELECT DISTINCT ON (name)
-                    name,
-                    colorIdentity,
-                    colorIndicator,
-                    flavorText,
-                    keywords,
-                    manaCost,
-                    manavalue,
-                    originalType,
-                    power,
-                    rarity,
-                    subtypes,
-                    supertypes,
-                    text,
-                    toughness,
-                    types,
-                    id,
-                    uuid
-                FROM cards
+    def get_cards_by_name(self, text: str) -> list[CardRecord]:
+        query = f"""
+                SELECT
+                    {SUMMARY_COLUMNS}
+                FROM oracle_cards
                 WHERE name ILIKE %s
-                  AND language = 'English'
-                ORDER BY name, id; \
+                ORDER BY name; \
                 """
         param = f"%{text}%"
-        with self.conn.cursor() as cur:
-            cur.execute(query, (param,))
-            columns = [desc[0] for desc in cur.description]
-            rows = cur.fetchall()
-            return [dict(zip(columns, row)) for row in rows]
+        return self._fetch_all(query, (param,), records=True)
+
+    def get_card_by_name(self, name: str) -> CardRecord | None:
+        query = f"""
+                SELECT
+                    {SUMMARY_COLUMNS}
+                FROM oracle_cards
+                WHERE lower(name) = lower(%s)
+                LIMIT 1; \
+                """
+        rows = self._fetch_all(query, (name,), records=True)
+        return rows[0] if rows else None
+
+    def get_cards_by_uuid(self, uuids: list[str]) -> list[CardRecord]:
+        query = f"""
+                SELECT
+                    {SUMMARY_COLUMNS}
+                FROM cards
+                WHERE uuid = ANY(%s); \
+                """
+        return self._fetch_all(query, (list(uuids),), records=True)
+
+    def get_deck_values(self, decks: dict, vendor: str, finish: str = "normal") -> dict[str, DeckValue]:
+        """
+        Price several decks at once at a vendor's latest prices.
+
+        ``decks`` maps a deck key to ``{uuid: quantity}``. All decks are sent as three
+        parallel arrays and priced in one query against ``card_prices_current`` (one primary
+        key probe per card). Decks without cards are omitted.
+        """
+        keys, uuids, quantities = _deck_arrays(decks)
+        if not keys:
+            return {}
+
+        query = """
+                SELECT dc.deck,
+                       coalesce(sum(dc.quantity * p.price), 0) AS total,
+                       max(p.currency) AS currency,
+                       count(p.price) AS priced,
+                       count(*) - count(p.price) AS unpriced
+                FROM unnest(%(keys)s::text[], %(uuids)s::text[], %(quantities)s::int[])
+                     AS dc(deck, uuid, quantity)
+                LEFT JOIN card_prices_current p
+                       ON p.uuid = dc.uuid AND p.vendor = %(vendor)s AND p.finish = %(finish)s
+                GROUP BY dc.deck;
+                """
+        params = {"keys": keys, "uuids": uuids, "quantities": quantities, "vendor": vendor, "finish": finish}
+        return {row["deck"]: DeckValue(row["total"], row["currency"], row["priced"], row["unpriced"])
+                for row in self._fetch_all(query, params)}
+
+    def get_deck_value_history(self, decks: dict, vendor: str, finish: str = "normal",
+                               since: date | None = None, bucket: str = "week") -> dict[str, list[tuple]]:
+        """
+        Value several decks over time, one point per ``bucket`` ("day", "week" or "month").
+
+        Each card contributes its last price within a bucket, so weeks thinned to a single
+        point (parse_mtg_prices.py --keep-daily-days) still add up. Only the partitions from
+        ``since`` (default: one year ago) onwards are read, each card through the primary key.
+        Returns ``{deck key: [(bucket start, total, priced cards), ...]}`` in date order.
+        """
+        if bucket not in ("day", "week", "month"):
+            raise ValueError(f"Unsupported bucket: {bucket}")
+        keys, uuids, quantities = _deck_arrays(decks)
+        if not keys:
+            return {}
+
+        query = """
+                WITH dc AS (
+                    SELECT * FROM unnest(%(keys)s::text[], %(uuids)s::text[], %(quantities)s::int[])
+                                  AS dc(deck, uuid, quantity)
+                ), points AS (
+                    SELECT DISTINCT ON (dc.deck, dc.uuid, bucket)
+                           dc.deck, dc.quantity, date_trunc(%(bucket)s, p.price_date)::date AS bucket, p.price
+                    FROM dc
+                    JOIN card_prices p
+                      ON p.uuid = dc.uuid AND p.vendor = %(vendor)s AND p.finish = %(finish)s
+                     AND p.price_date >= %(since)s
+                    ORDER BY dc.deck, dc.uuid, bucket, p.price_date DESC
+                )
+                SELECT deck, bucket, sum(quantity * price) AS total, count(*) AS priced
+                FROM points
+                GROUP BY deck, bucket
+                ORDER BY deck, bucket;
+                """
+        params = {"keys": keys, "uuids": uuids, "quantities": quantities, "vendor": vendor,
+                  "finish": finish, "bucket": bucket, "since": since or date.today() - timedelta(days=365)}
+        history = {}
+        for row in self._fetch_all(query, params):
+            history.setdefault(row["deck"], []).append((row["bucket"], row["total"], row["priced"]))
+        return history
+
+    def get_deck_price_range(self, cards: dict, vendors: list[str],
+                             finishes: tuple = ("normal", "foil", "etched")) -> DeckPriceRange:
+        """
+        Find the cheapest and most expensive printing of every card of a deck in one query.
+
+        ``cards`` is ``{uuid: quantity}``. Each card is matched to all printings with the same
+        name (``cards_lower_name_language`` index) and to their current prices at ``vendors``
+        in ``finishes``. Foil and non-foil offers only count for printings that exist in that
+        finish (``hasFoil`` / ``hasNonFoil``, ``finishes`` for etched). Pass vendors quoting in
+        a single currency.
+        """
+        uuids, quantities = list(cards), list(cards.values())
+        if not uuids:
+            return DeckPriceRange({}, Decimal(0), Decimal(0), None, [])
+
+        query = """
+                WITH deck AS (
+                    SELECT dc.uuid AS deck_uuid, dc.quantity, c.name
+                    FROM unnest(%(uuids)s::text[], %(quantities)s::int[]) AS dc(uuid, quantity)
+                    JOIN cards c ON c.uuid = dc.uuid
+                ), offers AS (
+                    SELECT deck.deck_uuid, pr.uuid, pr.setCode AS set_code,
+                           p.vendor, p.finish, p.price, p.currency
+                    FROM deck
+                    JOIN cards pr ON lower(pr.name) = lower(deck.name)
+                    JOIN card_prices_current p ON p.uuid = pr.uuid
+                    WHERE p.vendor = ANY(%(vendors)s)
+                      AND p.finish = ANY(%(finishes)s)
+                      AND CASE p.finish
+                              WHEN 'normal' THEN coalesce(pr.hasNonFoil, TRUE)
+                              WHEN 'foil' THEN coalesce(pr.hasFoil, FALSE)
+                              ELSE coalesce(pr.finishes, '') LIKE '%%' || p.finish || '%%'
+                          END
+                )
+                SELECT DISTINCT ON (deck_uuid)
+                       deck_uuid, uuid, set_code, vendor, finish, price, currency,
+                       max(price) OVER (PARTITION BY deck_uuid) AS max_price
+                FROM offers
+                ORDER BY deck_uuid, price, uuid;
+                """
+        params = {"uuids": uuids, "quantities": quantities, "vendors": list(vendors), "finishes": list(finishes)}
+        cheapest = {
+            row["deck_uuid"]: PrintingPrice(row["uuid"], row["set_code"], row["vendor"], row["finish"],
+                                            row["price"], row["max_price"], row["currency"])
+            for row in self._fetch_all(query, params)
+        }
+        return DeckPriceRange(
+            cheapest,
+            sum((cards[uuid] * offer.price for uuid, offer in cheapest.items()), Decimal(0)),
+            sum((cards[uuid] * offer.max_price for uuid, offer in cheapest.items()), Decimal(0)),
+            next((offer.currency for offer in cheapest.values()), None),
+            [uuid for uuid in uuids if uuid not in cheapest],
+        )
+
+    def _card_filter_clause(self, card_filter: CardFilter) -> tuple[str, dict]:
+        """
+        Translate a CardFilter into a parameterized WHERE clause.
+
+        Only placeholders are interpolated into the SQL text; every user value travels
+        in the returned parameter dict.
+        """
+        clauses = []
+        params = {"name": card_filter.name, "text": card_filter.text}
+
+        if card_filter.name:
+            clauses.append("name ILIKE %(name_pattern)s")
+            params["name_pattern"] = f"%{card_filter.name}%"
+        if card_filter.text:
+            clauses.append(
+                "(to_tsvector('english', coalesce(text, '')) @@ plainto_tsquery('english', %(text)s)"
+                " OR text ILIKE %(text_pattern)s)"
+            )
+            params["text_pattern"] = f"%{card_filter.text}%"
+        if card_filter.type:
+            clauses.append(r"%(type)s = ANY(regexp_split_to_array(lower(coalesce(types, '')), '\s*,\s*'))")
+            params["type"] = card_filter.type.lower()
+        if card_filter.subtype:
+            clauses.append("subtypes ILIKE %(subtype_pattern)s")
+            params["subtype_pattern"] = f"%{card_filter.subtype}%"
+        # Both color checks are "mask ⊆ allowed", spelled as an index-friendly list of submasks
+        if card_filter.excluded_colors:
+            clauses.append("mana_cost_mask = ANY(%(cost_masks)s)")
+            params["cost_masks"] = subset_masks(~card_filter.excluded_mask & 0b11111)
+        if card_filter.identity_mask is not None:
+            clauses.append("color_identity_mask = ANY(%(identity_masks)s)")
+            params["identity_masks"] = subset_masks(card_filter.identity_mask)
+        if card_filter.mana_min is not None:
+            clauses.append("coalesce(manaValue, 0) >= %(mana_min)s")
+            params["mana_min"] = card_filter.mana_min
+        if card_filter.mana_max is not None:
+            clauses.append("coalesce(manaValue, 0) <= %(mana_max)s")
+            params["mana_max"] = card_filter.mana_max
+
+        return " AND ".join(clauses) or "TRUE", params
+
+    def find_cards(self, card_filter: CardFilter, limit: int | None = None, offset: int = 0) -> list[CardRecord]:
+        """
+        Retrieve oracle cards (one English printing per name) matching ``card_filter``.
+
+        Substring predicates are served by the pg_trgm GIN indexes and the rules-text
+        ``@@`` predicate by ``oracle_cards_text_fts``. Results are ranked by full-text
+        relevance when a text is searched, then by name similarity when a name is searched,
+        then alphabetically. Without either the order is plain ``name``, which the unique
+        name index serves together with LIMIT instead of ranking every row.
+        """
+        where, params = self._card_filter_clause(card_filter)
+        order = []
+        if card_filter.text:
+            order.append("ts_rank(to_tsvector('english', coalesce(text, '')), "
+                         "plainto_tsquery('english', %(text)s)) DESC")
+        if card_filter.name:
+            order.append("similarity(name, %(name)s) DESC")
+        order.append("name")
+        query = f"""
+                SELECT
+                    {SUMMARY_COLUMNS}
+                FROM oracle_cards
+                WHERE {where}
+                ORDER BY {", ".join(order)}
+                LIMIT %(limit)s OFFSET %(offset)s; \
+                """
+        params.update(limit=limit, offset=offset)
+        return self._fetch_all(query, params, records=True)
+
+    def count_cards(self, card_filter: CardFilter) -> int:
+        """Count the oracle cards matching ``card_filter`` without fetching them."""
+        where, params = self._card_filter_clause(card_filter)
+        query = f"SELECT count(*) AS total FROM oracle_cards WHERE {where};"
+        return self._fetch_all(query, params)[0]["total"]
+
+    def search_cards(self, name: str = "", text: str = "") -> list[CardRecord]:
+        """Search cards by name and rules text only; see ``find_cards``."""
+        return self.find_cards(CardFilter(name=name, text=text))
+
+    def close(self):
+        self.pool.closeall()
+
+class AsyncDBManager:
+    """
+    Awaitable front-end for a DBManager, for use from Shiny's event loop.
+
+    psycopg2 calls block, so each query is offloaded to a dedicated thread pool sized to
+    the connection pool; the event loop stays free to serve other sessions while a query
+    runs, and independent queries can be awaited concurrently (e.g. with ``asyncio.gather``).
+
+    Parameters
+    ----------
+    db : DBManager | Callable[[], DBManager]
+        Synchronous manager whose pool the queries run on, or a factory returning it.
+        A factory is only called on the worker threads, so connecting never blocks the
+        event loop.
+    max_workers : int, optional
+        Number of worker threads (default is the size of the connection pool; required
+        when ``db`` is a factory).
+    """
+
+    def __init__(self, db, max_workers: int | None = None):
+        self._db = db
+        # The resolved manager; stays None until a factory has been called
+        self._manager = None if callable(db) else db
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or db.pool.maxconn,
+            thread_name_prefix="dbmanager"
+        )
+
+    @property
+    def db(self) -> DBManager:
+        if self._manager is None:
+            self._manager = self._db()
+        return self._manager
+
+    async def run(self, func, *args, **kwargs):
+        """Run any blocking callable on the query thread pool and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    async def get_all_cards(self) -> list[CardRecord]:
+        return await self.run(lambda: self.db.get_all_cards())
+
+    async def get_selected_card_data(self) -> list[CardRecord]:
+        return await self.run(lambda: self.db.get_selected_card_data())
+
+    async def get_cards_by_name(self, text: str) -> list[CardRecord]:
+        return await self.run(lambda: self.db.get_cards_by_name(text))
+
+    async def get_card_by_name(self, name: str) -> CardRecord | None:
+        return await self.run(lambda: self.db.get_card_by_name(name))
+
+    async def find_cards(self, card_filter: CardFilter, limit: int | None = None, offset: int = 0) -> list[CardRecord]:
+        return await self.run(lambda: self.db.find_cards(card_filter, limit=limit, offset=offset))
+
+    async def count_cards(self, card_filter: CardFilter) -> int:
+        return await self.run(lambda: self.db.count_cards(card_filter))
+
+    async def get_deck_values(self, decks: dict, vendor: str, finish: str = "normal") -> dict[str, DeckValue]:
+        return await self.run(lambda: self.db.get_deck_values(decks, vendor, finish))
+
+    async def get_deck_price_range(self, cards: dict, vendors: list[str],
+                                   finishes: tuple = ("normal", "foil", "etched")) -> DeckPriceRange:
+        return await self.run(lambda: self.db.get_deck_price_range(cards, vendors, finishes))
+
+    async def get_deck_value_history(self, decks: dict, vendor: str, finish: str = "normal",
+                                     since: date | None = None, bucket: str = "week") -> dict[str, list[tuple]]:
+        return await self.run(lambda: self.db.get_deck_value_history(decks, vendor, finish, since, bucket))
 
     def close(self):
-        self.conn.close()
+        self._executor.shutdown(wait=False)
+        # Do not call the factory here: an app that never queried has no pool to close
+        if self._manager is not None:
+            self._manager.close()
+
 
 # Example usage:
 def all_cards_full():
@@ -0,0 +1,483 @@
+import atexit
+import itertools
+import json
+import logging
+import os
+import pathlib
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from collections.abc import Mapping
+from datetime import datetime
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+
+
+def new_deck() -> dict:
+    """Return an empty deck."""
+    return {"cards": {}, "commander": [], "updated_at": datetime.utcnow().isoformat(), "favorite": False}
+
+
+def card_count(deck: dict) -> int:
+    """Number of cards in a deck, commanders included."""
+    return sum((deck.get("cards") or {}).values()) + len(deck.get("commander") or [])
+
+
+def needs_migration(deck) -> bool:
+    """True if a deck still embeds full card dicts (or predates the deck dict altogether)."""
+    if not isinstance(deck, dict):
+        return True
+    commanders = deck.get("commander")
+    return (not isinstance(deck.get("cards", {}), dict)
+            or not isinstance(commanders, list)
+            or any(not isinstance(c, str) for c in commanders))
+
+
+def migrate_deck(deck) -> dict:
+    """
+    Convert a deck that embeds a card dict per copy to uuid references with quantities.
+
+    ``{"cards": [card, card, ...], "commander": [card] | "" | card}`` becomes
+    ``{"cards": {uuid: quantity}, "commander": [uuid, ...]}``; other keys are kept.
+    Decks already in the new format are returned unchanged.
+    """
+    if not needs_migration(deck):
+        return deck
+    if not isinstance(deck, dict):
+        # Oldest format: {deck_name: [card, ...]}
+        deck = {"cards": deck, "commander": [], "updated_at": None}
+
+    cards = deck.get("cards") or []
+    if isinstance(cards, list):
+        cards = Counter(card["uuid"] for card in cards if isinstance(card, dict) and card.get("uuid"))
+
+    commanders = deck.get("commander") or []
+    if not isinstance(commanders, list):
+        commanders = [commanders]
+    commanders = [c["uuid"] if isinstance(c, dict) else c for c in commanders
+                  if isinstance(c, str) or (isinstance(c, dict) and c.get("uuid"))]
+
+    # Decks from before favorites had no flag (the Postgres store reads them back as False)
+    return {"favorite": False, **deck, "cards": dict(cards), "commander": commanders}
+
+
+class DeckStore(ABC):
+    """
+    Storage for the decks of every user.
+
+    Decks are exchanged as::
+
+        {deck_name: {"cards": {uuid: quantity, ...}, "commander": [uuid, ...],
+                     "updated_at": iso timestamp, "favorite": bool}}
+
+    Cards are referenced by MTGJSON uuid; their details are looked up in the card
+    catalog when a deck is shown (``utils.resolve_deck``). Besides loading and replacing
+    a user's decks wholesale, a store offers one method per edit the UI makes, so
+    backends that can change a single row do not have to rewrite everything.
+
+    Methods
+    -------
+    load_decks(username: str) -> dict
+        Return all decks of a user.
+    save_decks(username: str, decks: dict)
+        Replace all decks of a user.
+    create_deck(username: str, deck_name: str)
+        Create an empty deck unless it already exists.
+    delete_deck(username: str, deck_name: str)
+        Delete a deck and its cards.
+    set_favorite(username: str, deck_name: str, favorite: bool)
+        Mark or unmark a deck as favorite.
+    add_card(username: str, deck_name: str, uuid: str, quantity: int)
+        Add copies of a card to the main deck.
+    add_commander(username: str, deck_name: str, uuid: str)
+        Add a card to the command zone.
+    remove_card(username: str, deck_name: str, uuid: str) -> bool
+        Remove every copy of a card, commanders included; True if anything was removed.
+    """
+
+    def __init__(self):
+        # Serializes load-modify-save edits (and, for caching stores, access to the cache)
+        self._lock = threading.RLock()
+
+    @abstractmethod
+    def load_decks(self, username: str) -> dict:
+        """Return all decks of a user."""
+
+    @abstractmethod
+    def save_decks(self, username: str, decks: dict) -> None:
+        """Replace all decks of a user."""
+
+    # The edits below default to load-modify-save; backends override what they can do better
+
+    def _decks_for_update(self, username: str) -> dict:
+        """Return a user's decks for in-place modification."""
+        return self.load_decks(username)
+
+    def _update(self, username: str, change) -> bool:
+        with self._lock:
+            decks = self._decks_for_update(username)
+            if not change(decks):
+                return False
+            self.save_decks(username, decks)
+            return True
+
+    def _edit(self, username: str, deck_name: str, change) -> bool:
+        def change_deck(decks):
+            deck = decks.get(deck_name)
+            if deck is None or not change(deck):
+                return False
+            deck["updated_at"] = datetime.utcnow().isoformat()
+            return True
+        return self._update(username, change_deck)
+
+    def create_deck(self, username: str, deck_name: str) -> None:
+        def change(decks):
+            if deck_name in decks:
+                return False
+            decks[deck_name] = new_deck()
+            return True
+        self._update(username, change)
+
+    def delete_deck(self, username: str, deck_name: str) -> None:
+        self._update(username, lambda decks: decks.pop(deck_name, None) is not None)
+
+    def set_favorite(self, username: str, deck_name: str, favorite: bool) -> None:
+        def change(decks):
+            if deck_name not in decks:
+                return False
+            decks[deck_name]["favorite"] = favorite
+            return True
+        self._update(username, change)
+
+    def add_card(self, username: str, deck_name: str, uuid: str, quantity: int = 1) -> None:
+        def change(deck):
+            cards = deck.setdefault("cards", {})
+            cards[uuid] = cards.get(uuid, 0) + quantity
+            return True
+        self._edit(username, deck_name, change)
+
+    def add_commander(self, username: str, deck_name: str, uuid: str) -> None:
+        def change(deck):
+            commanders = deck.setdefault("commander", [])
+            if uuid in commanders:
+                return False
+            commanders.append(uuid)
+            return True
+        self._edit(username, deck_name, change)
+
+    def remove_card(self, username: str, deck_name: str, uuid: str) -> bool:
+        def change(deck):
+            removed = deck.get("cards", {}).pop(uuid, None) is not None
+            if uuid in deck.get("commander", []):
+                deck["commander"].remove(uuid)
+                removed = True
+            return removed
+        return self._edit(username, deck_name, change)
+
+
+class JsonDeckStore(DeckStore):
+    """
+    Deck store keeping one JSON file per user (``<directory>/<username>.json``).
+
+    Each user's file is parsed once and kept in memory; ``load_decks`` hands out a read-only
+    view of that copy, so repeated reads within a render cost nothing. Edits change the
+    in-memory copy and mark the user dirty; dirty users are written behind, ``flush_delay``
+    seconds after the last edit (but at most ``MAX_FLUSH_DELAY_FACTOR`` times that after the
+    first one), so a burst of edits costs one write. Files are replaced atomically
+    (temporary file + rename): a crash mid-write never leaves a truncated deck file.
+    Pending writes are flushed at interpreter exit.
+
+    Parameters
+    ----------
+    directory : pathlib.Path
+        Directory holding the deck files; created on first write.
+    flush_delay : float, optional
+        Seconds to wait for further edits before writing (default: env ``DECK_FLUSH_DELAY``
+        or 1.0). ``0`` writes synchronously on every edit.
+    """
+
+    # A steady stream of edits still gets written at least this often (times flush_delay)
+    MAX_FLUSH_DELAY_FACTOR = 10
+
+    # Seconds before a failed write is retried when edits are written synchronously (flush_delay 0)
+    RETRY_DELAY = 5.0
+
+    def __init__(self, directory: pathlib.Path, flush_delay: float | None = None):
+        super().__init__()
+        self.directory = pathlib.Path(directory)
+        self.flush_delay = float(os.getenv("DECK_FLUSH_DELAY", "1.0")) if flush_delay is None else flush_delay
+        self._cache: dict[str, dict] = {}
+        self._dirty: set[str] = set()
+        self._timer: threading.Timer | None = None
+        self._dirty_since: float | None = None
+        self._write_lock = threading.Lock()
+        # Snapshots are numbered so a slow writer never overwrites a newer file with an older one
+        self._snapshots = itertools.count()
+        self._written: dict[str, int] = {}
+        atexit.register(self.flush)
+
+    def deck_file(self, username: str) -> pathlib.Path:
+        """Return the deck file path for a given user."""
+        return self.directory / f"{username}.json"
+
+    def _read(self, username: str):
+        try:
+            with open(self.deck_file(username), "r") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _decks_for_update(self, username: str) -> dict:
+        with self._lock:
+            decks = self._cache.get(username)
+            if decks is None:
+                decks = self._read(username)
+                if isinstance(decks, list):
+                    # Auto-upgrade the old format (a list of deck names)
+                    self.save_decks(username, {name: new_deck() for name in decks})
+                elif any(needs_migration(deck) for deck in decks.values()):
+                    # Auto-upgrade decks that embed full card dicts
+                    self.save_decks(username, {name: migrate_deck(deck) for name, deck in decks.items()})
+                else:
+                    self._cache[username] = decks
+            return self._cache[username]
+
+    def load_decks(self, username: str) -> Mapping:
+        """Return a read-only view of a user's decks; edit through the store's methods."""
+        return MappingProxyType(self._decks_for_update(username))
+
+    def save_decks(self, username: str, decks: dict) -> None:
+        """Replace all decks of a user (upgrading older deck layouts); the file is written behind."""
+        with self._lock:
+            if decks is not self._cache.get(username):
+                self._cache[username] = {name: migrate_deck(deck) for name, deck in decks.items()}
+            self._mark_dirty(username)
+
+    def _mark_dirty(self, username: str) -> None:
+        with self._lock:
+            self._dirty.add(username)
+            if self.flush_delay <= 0:
+                write_now = True
+            else:
+                write_now = False
+                self._schedule_flush(self.flush_delay)
+        if write_now:
+            self.flush(username)
+
+    def _schedule_flush(self, delay: float) -> None:
+        """(Re)start the write-behind timer; called with ``_lock`` held."""
+        now = time.monotonic()
+        if self._dirty_since is None:
+            self._dirty_since = now
+        # Debounce: restart the timer on every edit, unless writes are overdue
+        if self._timer is None or now - self._dirty_since < delay * self.MAX_FLUSH_DELAY_FACTOR:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self, username: str | None = None) -> None:
+        """Write pending changes (of one user, or everyone) to disk now."""
+        # Lock order: _lock is never taken while _write_lock is held, because a synchronous
+        # edit (flush_delay 0) holds _lock while it waits for _write_lock
+        with self._lock:
+            users = [username] if username is not None else list(self._dirty)
+            payloads = {user: (next(self._snapshots), json.dumps(self._cache[user]))
+                        for user in users if user in self._dirty}
+            self._dirty.difference_update(payloads)
+            if not self._dirty:
+                self._dirty_since = None
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+
+        failed = []
+        with self._write_lock:
+            for user, (snapshot, payload) in payloads.items():
+                if snapshot < self._written.get(user, -1):
+                    continue  # a newer snapshot was written meanwhile
+                try:
+                    self._write(user, payload)
+                    self._written[user] = snapshot
+                except OSError as e:
+                    logger.warning("Could not save decks of %s, will retry: %s", user, e)
+                    failed.append(user)
+
+        if failed:
+            # Keep the users dirty and restart the timer, so the edits are retried
+            # without waiting for another edit
+            with self._lock:
+                self._dirty.update(failed)
+                self._schedule_flush(self.flush_delay if self.flush_delay > 0 else self.RETRY_DELAY)
+
+    def _write(self, username: str, payload: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.deck_file(username)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "w") as file:
+            file.write(payload)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+
+
+class PostgresDeckStore(DeckStore):
+    """
+    Deck store backed by the ``decks`` / ``deck_cards`` tables (see database/create_tables.sql).
+
+    A deck card is one ``(deck_id, card_uuid, is_commander)`` row with a quantity, so adding
+    a card is a single upsert and removing one a single delete, whatever the size of the deck.
+    Commanders and main-deck copies of the same card are separate rows, as in the JSON decks. Cards are
+    referenced by uuid rather than ``cards.id``: ids are reassigned when the card data is
+    reloaded, uuids are stable across MTGJSON releases.
+
+    Parameters
+    ----------
+    db_or_factory : DBManager | callable
+        The database manager, or a zero-argument callable returning it (e.g. ``utils.get_db``).
+    """
+
+    def __init__(self, db_or_factory):
+        super().__init__()
+        self._db = db_or_factory
+
+    @property
+    def db(self):
+        return self._db() if callable(self._db) else self._db
+
+    def load_decks(self, username: str) -> dict:
+        """Load all decks of a user in one query."""
+        query = """
+                SELECT d.deck_name, d.favorite, d.updated_at, dc.card_uuid, dc.quantity, dc.is_commander
+                FROM decks d
+                LEFT JOIN deck_cards dc ON dc.deck_id = d.deck_id
+                WHERE d.username = %s
+                ORDER BY d.deck_name, dc.card_uuid;
+                """
+        decks = {}
+        with self.db.cursor() as cur:
+            cur.execute(query, (username,))
+            for deck_name, favorite, updated_at, uuid, quantity, is_commander in cur.fetchall():
+                deck = decks.setdefault(deck_name, {
+                    "cards": {}, "commander": [], "updated_at": updated_at.isoformat(), "favorite": favorite,
+                })
+                if uuid is None:
+                    continue  # empty deck
+                if is_commander:
+                    deck["commander"].append(uuid)
+                else:
+                    deck["cards"][uuid] = quantity
+        return decks
+
+    def save_decks(self, username: str, decks: dict) -> None:
+        """Replace all decks of a user in one transaction (registration and migrations)."""
+        with self.db.connection() as conn:
+            conn.autocommit = False
+            with conn, conn.cursor() as cur:
+                cur.execute("DELETE FROM decks WHERE username = %s;", (username,))
+                for deck_name, deck in decks.items():
+                    deck = migrate_deck(deck)
+                    cur.execute(
+                        """
+                        INSERT INTO decks (username, deck_name, favorite, updated_at)
+                        VALUES (%s, %s, %s, COALESCE(%s::timestamp, now() AT TIME ZONE 'utc'))
+                        RETURNING deck_id;
+                        """,
+                        (username, deck_name, bool(deck.get("favorite")), deck.get("updated_at") or None),
+                    )
+                    deck_id = cur.fetchone()[0]
+                    rows = [(deck_id, uuid, False, quantity) for uuid, quantity in deck["cards"].items()]
+                    rows += [(deck_id, uuid, True, 1) for uuid in deck["commander"]]
+                    cur.executemany(
+                        """
+                        INSERT INTO deck_cards (deck_id, card_uuid, is_commander, quantity)
+                        VALUES (%s, %s, %s, %s)
+                        ON CONFLICT (deck_id, card_uuid, is_commander) DO UPDATE
+                        SET quantity = EXCLUDED.quantity;
+                        """,
+                        rows,
+                    )
+
+    def create_deck(self, username: str, deck_name: str) -> None:
+        with self.db.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO decks (username, deck_name) VALUES (%s, %s)
+                ON CONFLICT (username, deck_name) DO NOTHING;
+                """,
+                (username, deck_name),
+            )
+
+    def delete_deck(self, username: str, deck_name: str) -> None:
+        with self.db.cursor() as cur:
+            cur.execute("DELETE FROM decks WHERE username = %s AND deck_name = %s;", (username, deck_name))
+
+    def set_favorite(self, username: str, deck_name: str, favorite: bool) -> None:
+        with self.db.cursor() as cur:
+            cur.execute(
+                "UPDATE decks SET favorite = %s WHERE username = %s AND deck_name = %s;",
+                (favorite, username, deck_name),
+            )
+
+    def _upsert_card(self, username: str, deck_name: str, uuid: str, quantity: int, is_commander: bool) -> None:
+        # Touch the deck and upsert the card in a single statement
+        with self.db.cursor() as cur:
+            cur.execute(
+                """
+                WITH deck AS (
+                    UPDATE decks SET updated_at = now() AT TIME ZONE 'utc'
+                    WHERE username = %(username)s AND deck_name = %(deck_name)s
+                    RETURNING deck_id
+                )
+                INSERT INTO deck_cards (deck_id, card_uuid, is_commander, quantity)
+                SELECT deck_id, %(uuid)s, %(is_commander)s, %(quantity)s FROM deck
+                ON CONFLICT (deck_id, card_uuid, is_commander) DO UPDATE SET
+                    -- a commander is a single copy; main-deck cards accumulate
+                    quantity = CASE WHEN EXCLUDED.is_commander THEN 1
+                                    ELSE deck_cards.quantity + EXCLUDED.quantity END;
+                """,
+                {"username": username, "deck_name": deck_name, "uuid": uuid,
+                 "is_commander": is_commander, "quantity": quantity},
+            )
+
+    def add_card(self, username: str, deck_name: str, uuid: str, quantity: int = 1) -> None:
+        self._upsert_card(username, deck_name, uuid, quantity, False)
+
+    def add_commander(self, username: str, deck_name: str, uuid: str) -> None:
+        self._upsert_card(username, deck_name, uuid, 1, True)
+
+    def remove_card(self, username: str, deck_name: str, uuid: str) -> bool:
+        with self.db.cursor() as cur:
+            cur.execute(
+                """
+                WITH removed AS (
+                    DELETE FROM deck_cards dc
+                    USING decks d
+                    WHERE dc.deck_id = d.deck_id
+                      AND d.username = %s AND d.deck_name = %s AND dc.card_uuid = %s
+                    RETURNING dc.deck_id
+                )
+                UPDATE decks SET updated_at = now() AT TIME ZONE 'utc'
+                WHERE deck_id IN (SELECT deck_id FROM removed);
+                """,
+                (username, deck_name, uuid),
+            )
+            return cur.rowcount > 0
+
+
+def main():
+    """Migrate every deck file in a directory to uuid references in place: python decks.py [directory]"""
+    directory = pathlib.Path(sys.argv[1]) if len(sys.argv) > 1 else pathlib.Path(__file__).parent / "data" / "decks"
+    store = JsonDeckStore(directory, flush_delay=0)
+    for path in sorted(directory.glob("*.json")):
+        before = path.stat().st_size
+        store.load_decks(path.stem)  # migrates and rewrites the file if needed
+        print(f"{path.name}: {before} -> {path.stat().st_size} bytes")
+
+
+if __name__ == "__main__":
+    main()
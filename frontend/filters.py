@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+from typing import Optional
+
+# The five colors of Magic, in WUBRG order
+COLORS = ("W", "U", "B", "R", "G")
+
+# One bit per color, W = 1 ... G = 16
+COLOR_BITS = {color: 1 << i for i, color in enumerate(COLORS)}
+
+
+def color_mask(colors) -> int:
+    """Combine colors (e.g. {"W", "U"}) into a WUBRG bitmask; anything else is ignored."""
+    mask = 0
+    for color in colors:
+        mask |= COLOR_BITS.get(color, 0)
+    return mask
+
+
+def subset_masks(mask: int) -> list[int]:
+    """Every bitmask whose colors are a subset of ``mask`` (what an "identity ⊆ X" index probe matches)."""
+    return [m for m in range(1 << len(COLORS)) if m & ~mask == 0]
+
+
+def color_identity(card) -> set:
+    """Colors of a card's ``colorIdentity`` column (e.g. "B, G" -> {"B", "G"})."""
+    return {c.strip() for c in (card.get("coloridentity") or "").split(",")} & set(COLORS)
+
+
+@dataclass(frozen=True)
+class CardFilter:
+    """
+    Structured description of a card search, independent of where it runs.
+
+    Empty strings and ``None`` mean "do not filter on this field". The object is
+    immutable and hashable so it can be used as a cache key.
+
+    Attributes
+    ----------
+    name : str
+        Substring the card name must contain (case-insensitive).
+    text : str
+        Words the rules text must contain (substring or full-text match).
+    type : str
+        Card type the card must have (e.g. "creature"), case-insensitive.
+    subtype : str
+        Substring the subtypes must contain (case-insensitive).
+    allowed_colors : frozenset[str] | None
+        Colors (W/U/B/R/G) whose symbols, hybrid or Phyrexian included, may appear in the
+        mana cost; ``None`` allows all.
+    identity_colors : frozenset[str] | None
+        Colors the card's color identity must be a subset of (e.g. the commander's
+        identity); ``None`` allows all.
+    mana_min, mana_max : float | None
+        Inclusive mana value range.
+    """
+
+    name: str = ""
+    text: str = ""
+    type: str = ""
+    subtype: str = ""
+    allowed_colors: Optional[frozenset] = None
+    identity_colors: Optional[frozenset] = None
+    mana_min: Optional[float] = None
+    mana_max: Optional[float] = None
+
+    @property
+    def excluded_colors(self) -> tuple:
+        """Colors whose mana symbols must not appear in the mana cost."""
+        if self.allowed_colors is None:
+            return ()
+        return tuple(c for c in COLORS if c not in self.allowed_colors)
+
+    @property
+    def excluded_mask(self) -> int:
+        """Bitmask of ``excluded_colors``."""
+        return color_mask(self.excluded_colors)
+
+    @property
+    def identity_mask(self) -> Optional[int]:
+        """Bitmask of ``identity_colors``, or None when identity is not filtered."""
+        return None if self.identity_colors is None else color_mask(self.identity_colors)
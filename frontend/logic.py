@@ -2,14 +2,19 @@ from shiny import reactive, render, ui
 import humanize
 from datetime import datetime
 from layout import Page
+import startup
 from ui import login_ui, register_ui, logged_in_ui, deck_view_ui, card_search_ui
 from utils import (
     load_users, save_users,
-    load_decks, save_decks, is_basic_land,
-    get_all_cards, add_card_to_deck, render_mana_cost, render_text_with_icons
+    load_decks, save_decks, get_deck_store, get_deck_summary_async, resolve_deck_async, resolve_commanders_async, is_basic_land,
+    find_commander_candidates_async, get_deck_values_async, get_deck_price_range_async, find_card_by_name_async, search_cards_async, render_pager, add_card_to_deck, render_mana_cost, render_text_with_icons
 )
 from state import session_user, ui_mode, active_deck, card_update_counter, choose_commander_stage,commander_search_name
 from hash import hash_pw
+from filters import CardFilter
+from decks import card_count
+from analytics import CURVE_MAX
+from prices import PRICE_VENDOR, format_price
 
 # 🧠 Reactive values to show login/register feedback
 login_msg_val = reactive.Value("")
@@ -18,36 +23,18 @@ card_error_val = reactive.Value("")
 commander_error_val = reactive.Value("")
 commander_color_identity = reactive.Value(set())
 
+# 📄 Rows per page for search tables when no page size is selected
+DEFAULT_PAGE_SIZE = 50
 
-# 🔄 Load user data once on startup
-USERS = load_users()
+# 🔄 User data, loaded on first login/registration instead of at import time
+_users = None
 
-TAG_ORDER = [
-    "commander", "artifact", "battle", "conspiracy", "creature", "dungeon",
-    "enchantment", "instant", "kindred", "land", "phenomenon", "plane",
-    "planeswalker", "scheme", "sorcery", "vanguard"
-]
-
-def get_card_type(card_data, commander_names):
-    name = card_data.get("name", "")
-    if name in commander_names:
-        return "commander"
-
-    types_field = card_data.get("types")
-    if not types_field:
-        return "other"
-
-    # Zorg dat types altijd een lijst is
-    if isinstance(types_field, str):
-        types_field = [t.strip() for t in types_field.split(",")]
-
-    # Match met de eerste tag uit TAG_ORDER die in types voorkomt
-    for tag in TAG_ORDER:
-        if tag.lower() in [t.lower() for t in types_field]:
-            return tag
-
-    return "other"
 
+def get_users():
+    global _users
+    if _users is None:
+        _users = load_users()
+    return _users
 
 
 # 🔁 Utility: trigger deck/card list UI to refresh
@@ -60,12 +47,6 @@ def get_clean_input(input, name):
     return input[name]().strip()
 
 
-# 📦 Utility: save decks and trigger UI update
-def update_decks_and_refresh(username, decks):
-    save_decks(username, decks)
-    trigger_update()
-
-
 # ⏱️ Utility: format "updated_at" timestamps into "2 minutes ago"
 def format_updated(updated_at):
     if not updated_at:
@@ -77,6 +58,16 @@ def format_updated(updated_at):
         return ""
 
 
+# 💰 Utility: deck value cell, flagging cards without a price
+def format_deck_value(value):
+    if not value.priced:
+        return "—"
+    text = format_price(value.total, value.currency)
+    if value.unpriced:
+        return ui.span(f"{text}*", title=f"{value.unpriced} card(s) without a {PRICE_VENDOR} price")
+    return text
+
+
 # 🚀 Main reactive server logic
 def server(input, output, session):
     # Text feedback messages for login and register
@@ -99,6 +90,10 @@ def server(input, output, session):
         if not user:
             return Page.build_view("Login", login_ui) if ui_mode.get() == "login" else Page.build_view("Register",
                                                                                                        register_ui)
+        # ⏳ Every logged-in view needs the card data: wait for the warm-up instead of blocking on it
+        if not startup.is_ready():
+            reactive.invalidate_later(0.5)
+            return Page.build_view("Loading", ui.p("⏳ Loading card data…"))
         if deck:
             return Page.build_view(f"Deck: {deck}", deck_view_ui(deck))
         return Page.build_view("Your Decks", logged_in_ui(user))
@@ -106,7 +101,7 @@ def server(input, output, session):
     # List decks with buttons to open/delete
     @output
     @render.ui
-    def deck_list():
+    async def deck_list():
         username = session_user.get()
         _ = card_update_counter.get()
         if not username:
@@ -121,11 +116,15 @@ def server(input, output, session):
             if search in name.lower()
         }
 
+        # 💰 One batched price query for all listed decks
+        values = await get_deck_values_async(filtered)
+
         header = ui.tags.tr(
             ui.tags.th(""),  # ⭐
             ui.tags.th("Name"),
             ui.tags.th("Colors"),
             ui.tags.th("Commander"),
+            ui.tags.th("Value"),
             ui.tags.th("Last Updated"),
             ui.tags.th("")  # ❌
         )
@@ -134,15 +133,10 @@ def server(input, output, session):
         for deck in sorted(filtered, key=lambda d: (not filtered[d].get("favorite", False), d.lower())):
             deck_data = filtered[deck]
 
-            # Extract colors from commanders' mana costs
-            commander_colors = set()
-            for commander in deck_data.get("commander", []):
-                mana = commander.get("manacost") or ""
-                for pip in mana.split("}"):
-                    if "{" in pip:
-                        symbol = pip.strip("{}").upper()
-                        if symbol in {"W", "U", "B", "R", "G"}:
-                            commander_colors.add(symbol)
+            # Deck colors = union of the commanders' color identities (from the cached summary)
+            summary = await get_deck_summary_async(username, deck, deck_data)
+            commanders = summary.commanders
+            commander_colors = summary.colors
 
             rows.append(ui.tags.tr(
                 ui.tags.td(
@@ -164,8 +158,9 @@ def server(input, output, session):
                            title=color)
                     for color in sorted(commander_colors)
                 ]),
-                ui.tags.td(" | ".join([c.get("name", "?") for c in deck_data.get("commander", [])])
-                           if deck_data.get("commander") else "—"),
+                ui.tags.td(" | ".join([c.get("name", "?") for c in commanders])
+                           if commanders else "—"),
+                ui.tags.td(format_deck_value(values[deck])),
                 ui.tags.td(format_updated(deck_data.get("updated_at"))),
                 ui.tags.td(
                     ui.a("❌", href="#", class_="delete-deck",
@@ -200,7 +195,8 @@ def server(input, output, session):
     async def handle_login():
         username = get_clean_input(input, "username")
         password = get_clean_input(input, "password")
-        if username in USERS and USERS[username] == hash_pw(password):
+        users = get_users()
+        if username in users and users[username] == hash_pw(password):
             session_user.set(username)
             active_deck.set(None)
         else:
@@ -222,12 +218,13 @@ def server(input, output, session):
             register_msg_val.set("❌ Passwords do not match.")
             return
 
-        if new_user in USERS:
+        users = get_users()
+        if new_user in users:
             register_msg_val.set("❌ Username already exists.")
             return
 
-        USERS[new_user] = hash_pw(new_pass)
-        save_users(USERS)
+        users[new_user] = hash_pw(new_pass)
+        save_users(users)
         save_decks(new_user, {})
         session_user.set(new_user)
         active_deck.set(None)
@@ -248,14 +245,8 @@ def server(input, output, session):
         if not username or not deck_name:
             return
 
-        decks = load_decks(username)
-        if deck_name not in decks:
-            decks[deck_name] = {
-                "cards": [],
-                "commander": "",  # 👈 NEW field
-                "updated_at": datetime.utcnow().isoformat()
-            }
-            update_decks_and_refresh(username, decks)
+        get_deck_store().create_deck(username, deck_name)
+        trigger_update()
 
         active_deck.set(deck_name)
 
@@ -282,12 +273,10 @@ def server(input, output, session):
         if not username or not deck_to_delete:
             return
 
-        decks = load_decks(username)
-        if deck_to_delete in decks:
-            del decks[deck_to_delete]
-            update_decks_and_refresh(username, decks)
-            if active_deck.get() == deck_to_delete:
-                active_deck.set(None)
+        get_deck_store().delete_deck(username, deck_to_delete)
+        trigger_update()
+        if active_deck.get() == deck_to_delete:
+            active_deck.set(None)
 
     # Add a card to the active deck
     @reactive.effect
@@ -314,8 +303,7 @@ def server(input, output, session):
 
         decks = load_decks(username)
         if deck in decks:
-            decks[deck]["favorite"] = not decks[deck].get("favorite", False)
-            save_decks(username, decks)
+            get_deck_store().set_favorite(username, deck, not decks[deck].get("favorite", False))
             trigger_update()
 
     # Remove a card from the active deck
@@ -325,27 +313,10 @@ def server(input, output, session):
         username, deck = session_user.get(), active_deck.get()
         card_to_delete = input.delete_card()
 
+        # Removes every copy, from the main deck and the command zone
         if username and deck and card_to_delete:
-            decks = load_decks(username)
-            if deck in decks:
-                deck_data = decks[deck]
-                changed = False
-
-                # Remove from normal cards
-                if "cards" in deck_data:
-                    before = len(deck_data["cards"])
-                    deck_data["cards"] = [c for c in deck_data["cards"] if c.get("name") != card_to_delete]
-                    changed |= len(deck_data["cards"]) < before
-
-                # Remove from commanders
-                if "commander" in deck_data:
-                    before = len(deck_data["commander"])
-                    deck_data["commander"] = [c for c in deck_data["commander"] if c.get("name") != card_to_delete]
-                    changed |= len(deck_data["commander"]) < before
-
-                if changed:
-                    deck_data["updated_at"] = datetime.utcnow().isoformat()
-                    update_decks_and_refresh(username, decks)
+            if get_deck_store().remove_card(username, deck, card_to_delete):
+                trigger_update()
 
     @output
     @render.text
@@ -356,53 +327,68 @@ def server(input, output, session):
     show_card_search = reactive.Value(False)
     search_name_value = reactive.Value("")
 
+    # Current page (0-based) of the card and commander search tables
+    card_search_page = reactive.Value(0)
+    commander_search_page = reactive.Value(0)
+
+    def page_size():
+        if "search_page_size" in input and input.search_page_size():
+            return int(input.search_page_size())
+        return DEFAULT_PAGE_SIZE
+
+    @reactive.effect
+    @reactive.event(input.card_search_page)
+    def set_card_search_page():
+        card_search_page.set(input.card_search_page())
+
+    @reactive.effect
+    @reactive.event(input.commander_search_page)
+    def set_commander_search_page():
+        commander_search_page.set(input.commander_search_page())
+
+    # Any change to the filters starts the results over at the first page
+    @reactive.effect
+    @reactive.event(search_name_value, input.filter_type, input.filter_flavor, input.filter_subtype,
+                    input.filter_mana_colors, input.filter_mana_range, input.search_page_size)
+    def reset_card_search_page():
+        card_search_page.set(0)
+
+    @reactive.effect
+    @reactive.event(choose_commander_stage, commander_search_name)
+    def reset_commander_search_page():
+        commander_search_page.set(0)
+
     @output
     @render.ui
-    def filtered_card_list():
+    async def filtered_card_list():
         name_filter = search_name_value.get() or ""
         type_filter = input.filter_type() or ""
         text_filter = input.filter_flavor() or ""
         subtype_filter = input.filter_subtype() or ""
         mana_filter = input.filter_mana_colors() or []
 
-        cards = get_all_cards()
-
-        def matches(card):
-            name_ok = name_filter.lower() in (card.get("name") or "").lower()
-
-            card_types = card.get("types", [])
-            if isinstance(card_types, str):
-                card_types = [t.strip() for t in card_types.split(",")]
-            type_ok = not type_filter or type_filter.lower() in [t.lower() for t in card_types]
-
-            subtype_ok = subtype_filter.lower() in (card.get("subtypes") or "").lower()
-            text_ok = text_filter.lower() in (card.get("text") or "").lower()
-
-            mana_cost = card.get("manacost") or ""
-            mana_cost_pips = {p.strip("{}") for p in mana_cost.split("}") if "{" in p}
-
-            mana_range = input.filter_mana_range() if "filter_mana_range" in input else (0, 15)
-            mana_value = card.get("cmc") or card.get("manavalue") or 0
-            mana_ok = mana_range[0] <= mana_value <= mana_range[1]
-
-            commander_colors = commander_color_identity()
-
-            # Only enforce color identity if no mana color filter is applied
-            if mana_filter:
-                allowed = set(mana_filter)
-                all_pips = {pip for pip in mana_cost_pips if pip in {"W", "U", "B", "R", "G"}}
-                extras = all_pips - allowed
-                if extras:
-                    return False
-            else:
-                for pip in mana_cost_pips:
-                    if pip in {"W", "U", "B", "R", "G"} and pip not in commander_colors:
-                        return False
-
-
-            return name_ok and type_ok and text_ok and subtype_ok and mana_ok
+        mana_range = input.filter_mana_range() if "filter_mana_range" in input else (0, 15)
+
+        # Only enforce the commander's color identity if no mana color filter is applied
+        card_filter = CardFilter(
+            name=name_filter.strip(),
+            text=text_filter.strip(),
+            type=type_filter,
+            subtype=subtype_filter.strip(),
+            allowed_colors=frozenset(mana_filter) if mana_filter else None,
+            identity_colors=None if mana_filter else frozenset(await commander_color_identity()),
+            mana_min=mana_range[0],
+            mana_max=mana_range[1],
+        )
 
-        filtered = [card for card in cards if matches(card)]
+        # All filtering happens in SQL (or the columnar catalog); only the visible page comes back
+        size = page_size()
+        page = card_search_page.get()
+        total, filtered = await search_cards_async(card_filter, limit=size, offset=page * size)
+        if page * size >= total > 0:
+            # Filters shrank the result set past the current page: show the last one
+            page = (total - 1) // size
+            total, filtered = await search_cards_async(card_filter, limit=size, offset=page * size)
 
         headers = ui.tags.tr(
             ui.tags.th("Add"),
@@ -446,15 +432,18 @@ def server(input, output, session):
                            style="border: 1px solid #ccc; padding: 6px; white-space: pre-wrap;")
             ))
 
-        return ui.tags.table(
-            {"style": "width: 100%; border-collapse: collapse; border: 1px solid #ccc;"},
-            headers,
-            *rows
+        return ui.div(
+            render_pager("card_search_page", page, size, total),
+            ui.tags.table(
+                {"style": "width: 100%; border-collapse: collapse; border: 1px solid #ccc;"},
+                headers,
+                *rows
+            )
         )
 
     @reactive.effect
     @reactive.event(input.add_commander_btn)
-    def handle_add_commander():
+    async def handle_add_commander():
         search_name_value.set(input.card_name())
         show_card_search.set(True)
 
@@ -468,13 +457,10 @@ def server(input, output, session):
         deck_data = decks.get(deck)
 
         if deck_data:
-            commander_data = deck_data.get("commander", [])
-            if isinstance(commander_data, str):
-                commander_data = [commander_data] if commander_data else []
+            commander_data = await resolve_commanders_async(deck_data)
 
             # Fetch full card info
-            cards_db = get_all_cards()
-            match = next((c for c in cards_db if c.get("name") == card_name), None)
+            match = await find_card_by_name_async(card_name)
             if not match:
                 return
 
@@ -485,64 +471,49 @@ def server(input, output, session):
                 commander_error_val.set("⚠️ You can only have 2 commanders.")
                 return
 
-            commander_data.append(match)
-            deck_data["commander"] = commander_data
-            deck_data["updated_at"] = datetime.utcnow().isoformat()
+            get_deck_store().add_commander(username, deck, match["uuid"])
             commander_error_val.set("")  # ✅ Clear error
-            update_decks_and_refresh(username, decks)
+            trigger_update()
 
     @output
     @render.ui
-    def deck_card_list():
-        from collections import defaultdict, Counter
-
-        deck_data = current_deck_data()
-        if not deck_data:
+    async def deck_card_list():
+        if not current_deck_data():
             return ui.div()
 
-        all_cards = deck_data.get("cards", [])
-        commander_cards = deck_data.get("commander", [])
-
-        grouped = defaultdict(list)
-        for card in commander_cards:
-            grouped["commander"].append(card)
-        for card in all_cards:
-            card_type = get_card_type(card, [c["name"] for c in commander_cards])
-            grouped[card_type].append(card)
-
-        for tag in grouped:
-            grouped[tag] = sorted(grouped[tag], key=lambda c: c.get("cmc") or c.get("manavalue") or 0)
-
+        summary = await current_deck_summary()
         sections = []
-        for tag in TAG_ORDER:
-            cards = grouped.get(tag)
-            if not cards:
-                continue
-
-            name_counter = Counter(card["name"] for card in cards)
-            unique_cards = {}
-            for card in cards:
-                if card["name"] not in unique_cards:
-                    unique_cards[card["name"]] = card
-
+        for tag, entries in summary.groups.items():
             sections.append(
                 ui.div(
-                    ui.h4(f"{tag.capitalize()} ({len(cards)})"),
+                    ui.h4(f"{tag.capitalize()} ({summary.type_counts[tag]})"),
                     ui.tags.ul(*[
                         ui.tags.li(
-                            ui.span(f"{name_counter[name]}× {name} "),
+                            ui.span(f"{quantity}× {card['name']} "),
                             ui.HTML(render_mana_cost(card.get("manacost"))),
-                            ui.a("❌", href="#", class_="delete-card", **{"data-card": name})
+                            ui.a("❌", href="#", class_="delete-card", **{"data-card": card["uuid"]})
                         )
-                        for name, card in unique_cards.items()
+                        for card, quantity in entries
                     ]),
                     style="display: flex; flex-direction: column;"
                 )
             )
 
+        # 📊 Deck statistics line
+        curve = " ".join(f"{'7+' if mv == CURVE_MAX else mv}:{count}" for mv, count in summary.curve.items() if count)
+        pips = " ".join(f"{color}:{count}" for color, count in summary.pips.items())
+        stats = ui.p(
+            f"Avg. mana value {summary.average_mana_value:.2f} · {summary.land_count} lands"
+            + (f" · Curve {curve}" if curve else "") + (f" · Pips {pips}" if pips else ""),
+            style="color: #555;"
+        )
+
         return ui.div(
-            *sections,
-            style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 2rem; align-items: start;"
+            stats,
+            ui.div(
+                *sections,
+                style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 2rem; align-items: start;"
+            )
         )
 
     @output
@@ -552,7 +523,7 @@ def server(input, output, session):
 
     @reactive.effect
     @reactive.event(input.add_selected_card)
-    def add_card_from_list():
+    async def add_card_from_list():
         deck = active_deck.get()
         card_name = input.add_selected_card()
         if deck and card_name:
@@ -560,21 +531,20 @@ def server(input, output, session):
             deck_data = decks[deck]
 
             # Haal de kaartinfo op uit de DB
-            cards_db = get_all_cards()
-            match = next((c for c in cards_db if c.get("name") == card_name), None)
+            match = await find_card_by_name_async(card_name)
             if not match:
                 return
 
             # Alleen check op duplicaten als het géén basic land is
-            if not is_basic_land(match) and any(c.get("name") == card_name for c in deck_data.get("cards", [])):
+            if not is_basic_land(match) and any(
+                    c.get("name") == card_name for c, _ in (await resolve_deck_async(deck_data))[1]):
                 card_error_val.set("⚠️ This card is already in your deck.")
                 return
             else:
                 card_error_val.set("")
 
             # Voeg toe
-            deck_data["cards"].append(match)
-            save_decks(session_user.get(), decks)
+            get_deck_store().add_card(session_user.get(), deck, match["uuid"])
             card_update_counter.set(card_update_counter.get() + 1)
 
     @output
@@ -584,8 +554,7 @@ def server(input, output, session):
         return f"Deck: {deck}" if deck else ""
 
         decks = load_decks(session_user.get())
-        deck_data = decks.get(deck, {})
-        count = len(deck_data.get("cards", [])) + len(deck_data.get("commander", []))
+        count = card_count(decks.get(deck, {}))
         return f"Deck: {deck} ({count}/100 cards)"
 
     @output
@@ -611,6 +580,11 @@ def server(input, output, session):
         decks = load_decks(username)
         return decks.get(deck, {})
 
+    @reactive.calc
+    async def current_deck_summary():
+        # 📊 Curve, pips, sections, ... computed once per deck revision
+        return await get_deck_summary_async(session_user.get(), active_deck.get(), current_deck_data())
+
     @output
     @render.text
     def deck_card_counter():
@@ -619,26 +593,35 @@ def server(input, output, session):
         if not deck:
             return ""
 
-        decks = load_decks(session_user.get())
-        deck_data = decks.get(deck, {})
-        count = len(deck_data.get("cards", [])) + len(deck_data.get("commander", []))
+        count = card_count(current_deck_data())
         return f"{count}/100 cards"
 
+    # 💰 Cheapest / most expensive way to buy the deck across all printings
+    @output
+    @render.text
+    async def deck_price_range():
+        deck_data = current_deck_data()
+        if not deck_data:
+            return ""
+
+        price_range = await get_deck_price_range_async(deck_data)
+        if not price_range.cheapest:
+            return ""
+        text = (f"{format_price(price_range.min_total, price_range.currency)} – "
+                f"{format_price(price_range.max_total, price_range.currency)}")
+        if price_range.missing:
+            text += f" ({len(price_range.missing)} without price)"
+        return text
+
     @reactive.effect
     @reactive.event(input.choose_commander_btn)
-    def show_commander_picker():
+    async def show_commander_picker():
         username, deck = session_user.get(), active_deck.get()
         if not username or not deck:
             return
 
         decks = load_decks(username)
-        deck_data = decks.get(deck, {})
-        commanders = deck_data.get("commander", [])
-
-        if isinstance(commanders, dict):
-            commanders = [commanders]
-        elif isinstance(commanders, str):
-            commanders = [commanders] if commanders else []
+        commanders = await resolve_commanders_async(decks.get(deck, {}))
 
         show_card_search.set(False)  # 👈 Close card search first
 
@@ -664,42 +647,20 @@ def server(input, output, session):
 
     @output
     @render.ui
-    def commander_search_view():
+    async def commander_search_view():
         stage = choose_commander_stage.get()
         if stage == "closed":
             return ui.div()
 
-        name_filter = commander_search_name.get().lower().strip()
-        cards = get_all_cards()
+        # 👑 Only this stage's precomputed candidates are filtered by name
+        name_filter = commander_search_name.get()
+        filtered = await find_commander_candidates_async(stage, name_filter)
 
-        if stage == "first":
-            filtered = [
-                card for card in cards
-                if "Legendary" in (card.get("supertypes") or []) and (
-                        "Creature" in (card.get("types") or []) or
-                        ("Planeswalker" in (card.get("types") or []) and "can be your commander" in (
-                                    card.get("text") or "").lower())
-                )
-            ]
-        elif stage == "partner":
-            filtered = [
-                card for card in cards
-                if "Legendary" in (card.get("supertypes") or []) and
-                   "Creature" in (card.get("types") or []) and
-                   "partner" in (card.get("text") or "").lower()
-            ]
-        elif stage == "background":
-            filtered = [
-                card for card in cards
-                if "Legendary" in (card.get("supertypes") or []) and
-                   "Enchantment" in (card.get("types") or []) and
-                   "Background" in (card.get("subtypes") or [])
-            ]
-        else:
-            filtered = []
-
-        if name_filter:
-            filtered = [card for card in filtered if name_filter in card["name"].lower()]
+        # Only build rows for the visible page
+        size = page_size()
+        total = len(filtered)
+        page = min(commander_search_page.get(), max(total - 1, 0) // size)
+        filtered = filtered[page * size:(page + 1) * size]
 
         headers = ui.tags.tr(
             ui.tags.th("Add"),
@@ -744,6 +705,7 @@ def server(input, output, session):
             ))
 
         return ui.div(
+            render_pager("commander_search_page", page, size, total),
             ui.tags.table(
                 {"style": "width: 100%; border-collapse: collapse; border: 1px solid #ccc;"},
                 headers,
@@ -758,7 +720,7 @@ def server(input, output, session):
 
     @reactive.effect
     @reactive.event(input.commander_choice)
-    def handle_commander_choice():
+    async def handle_commander_choice():
         card_name = input.commander_choice()
         username, deck = session_user.get(), active_deck.get()
 
@@ -770,12 +732,9 @@ def server(input, output, session):
         if not deck_data:
             return
 
-        commander_data = deck_data.get("commander", [])
-        if isinstance(commander_data, str):
-            commander_data = [commander_data] if commander_data else []
+        commander_data = await resolve_commanders_async(deck_data)
 
-        cards_db = get_all_cards()
-        match = next((c for c in cards_db if c.get("name") == card_name), None)
+        match = await find_card_by_name_async(card_name)
         if not match:
             return
 
@@ -787,25 +746,12 @@ def server(input, output, session):
             commander_error_val.set("⚠️ You can only have 2 commanders.")
             return
 
-        commander_data.append(match)
-        deck_data["commander"] = commander_data
-        deck_data["updated_at"] = datetime.utcnow().isoformat()
+        get_deck_store().add_commander(username, deck, match["uuid"])
         commander_error_val.set("")
-        update_decks_and_refresh(username, decks)
+        trigger_update()
 
         choose_commander_stage.set("closed")
 
     @reactive.calc
-    def commander_color_identity():
-        deck_data = current_deck_data()
-        commanders = deck_data.get("commander", [])
-        identity = set()
-
-        for cmd in commanders:
-            mana = cmd.get("manacost", "")
-            for pip in mana.split("}"):
-                if "{" in pip:
-                    symbol = pip.strip("{}").upper()
-                    if symbol in {"W", "U", "B", "R", "G"}:
-                        identity.add(symbol)
-        return identity
+    async def commander_color_identity():
+        return set((await current_deck_summary()).colors)
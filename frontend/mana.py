@@ -0,0 +1,116 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from filters import COLORS
+
+# One mana symbol, e.g. "{2}{W}{U/B}" -> "2", "W", "U/B"
+SYMBOL_PATTERN = re.compile(r"\{([^}]+)\}")
+
+# Distinct cost strings in the catalog number in the low thousands
+CACHE_SIZE = 8192
+
+# Rendered rules texts kept in memory (roughly one per card on screen recently)
+RULES_TEXT_CACHE_SIZE = 20000
+
+
+class ManaCost(NamedTuple):
+    """
+    Parsed mana cost string.
+
+    Attributes
+    ----------
+    symbols : tuple[str, ...]
+        Every symbol in order, without braces (e.g. ("2", "W", "U/B")).
+    colors : frozenset[str]
+        Colors (W/U/B/R/G) of any symbol, hybrid and Phyrexian included.
+    generic : int
+        Total of the numeric symbols (e.g. 2 for "{2}{W}").
+    pips : tuple[str, ...]
+        Plain single-color symbols (e.g. ("W", "W") for "{W}{W}").
+    hybrid : tuple[str, ...]
+        Hybrid symbols such as "U/B" or "2/W" (Phyrexian hybrids included).
+    phyrexian : tuple[str, ...]
+        Phyrexian symbols such as "G/P" or "B/G/P".
+    variable : tuple[str, ...]
+        X / Y / Z symbols.
+    """
+
+    symbols: tuple
+    colors: frozenset
+    generic: int
+    pips: tuple
+    hybrid: tuple
+    phyrexian: tuple
+    variable: tuple
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_mana_cost(cost: Optional[str]) -> ManaCost:
+    """Tokenize a mana cost string once; repeated costs are served from the cache."""
+    symbols = tuple(SYMBOL_PATTERN.findall(cost or ""))
+    colors = set()
+    generic = 0
+    pips, hybrid, phyrexian, variable = [], [], [], []
+
+    for symbol in symbols:
+        upper = symbol.upper()
+        colors.update(c for c in upper.split("/") if c in COLORS)
+        if upper.isdigit():
+            generic += int(upper)
+        elif upper in COLORS:
+            pips.append(upper)
+        elif upper in {"X", "Y", "Z"}:
+            variable.append(upper)
+        if upper.endswith("/P"):
+            phyrexian.append(upper)
+        if upper.count("/") > (1 if upper.endswith("/P") else 0):
+            hybrid.append(upper)
+
+    return ManaCost(symbols, frozenset(colors), generic, tuple(pips), tuple(hybrid),
+                    tuple(phyrexian), tuple(variable))
+
+
+@lru_cache(maxsize=256)
+def mana_symbol_to_filename(symbol: str) -> str:
+    """Convert mana symbol to corresponding filename."""
+    if "/" in symbol:
+        return symbol.replace("/", "").upper()
+    elif symbol.isdigit():
+        return symbol
+    elif symbol.upper() in {"X", "Y", "Z"}:
+        return f"C_{symbol.upper()}"
+    return symbol.upper()
+
+
+@lru_cache(maxsize=256)
+def mana_icon_html(symbol: str) -> str:
+    """Return the <img> tag for one mana symbol (without braces)."""
+    filename = mana_symbol_to_filename(symbol)
+    return (f"<img src='/icons/{filename}.svg' title='{filename}' height='16px' "
+            f"style='vertical-align: middle; margin-right: 2px;'/>")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def mana_cost_html(cost: Optional[str]) -> str:
+    """Return the icon HTML for a whole mana cost, built once per distinct cost string."""
+    if not cost:
+        return ""
+    return "<span>" + "".join(mana_icon_html(s) for s in parse_mana_cost(cost).symbols) + "</span>"
+
+
+def _icon_for_match(match) -> str:
+    return mana_icon_html(match.group(1))
+
+
+@lru_cache(maxsize=RULES_TEXT_CACHE_SIZE)
+def rules_text_html(text: Optional[str]) -> str:
+    """
+    Return rules text as HTML with line breaks and mana symbol icons, once per distinct text.
+
+    Keyed on the text itself, so every printing (and every card sharing a reminder text)
+    reuses one entry. Mojibake is repaired at ingest (parsing/parse_mtg_data.py), not here.
+    """
+    if not text:
+        return ""
+    return SYMBOL_PATTERN.sub(_icon_for_match, text.replace("\n", "<br>"))
@@ -0,0 +1,98 @@
+import os
+from decimal import Decimal
+from typing import NamedTuple, Optional
+
+# Vendor and finish deck values are quoted in (vendors as named in MTGJSON AllPrices)
+PRICE_VENDOR = os.environ.get("PRICE_VENDOR", "tcgplayer")
+PRICE_FINISH = os.environ.get("PRICE_FINISH", "normal")
+
+# Symbols for the currencies MTGJSON vendors quote in
+CURRENCY_SYMBOLS = {"USD": "$", "EUR": "€"}
+
+
+class DeckValue(NamedTuple):
+    """
+    Value of one deck at a single vendor's latest prices.
+
+    Attributes
+    ----------
+    total : Decimal
+        Sum of quantity × latest price over the priced cards.
+    currency : str | None
+        Currency of the prices (None if no card has a price).
+    priced : int
+        Number of distinct cards with a price.
+    unpriced : int
+        Number of distinct cards without a price at this vendor and finish.
+    """
+
+    total: Decimal = Decimal(0)
+    currency: Optional[str] = None
+    priced: int = 0
+    unpriced: int = 0
+
+
+class PrintingPrice(NamedTuple):
+    """
+    Cheapest offer found for one deck card across all of its printings.
+
+    Attributes
+    ----------
+    uuid : str
+        The printing to buy (may differ from the uuid stored in the deck).
+    set_code : str
+        Set of that printing.
+    vendor, finish : str
+        Where and in which finish the price applies.
+    price : Decimal
+        Cheapest price per copy.
+    max_price : Decimal
+        Most expensive price per copy among the same offers.
+    currency : str
+        Currency of both prices.
+    """
+
+    uuid: str
+    set_code: str
+    vendor: str
+    finish: str
+    price: Decimal
+    max_price: Decimal
+    currency: str
+
+
+class DeckPriceRange(NamedTuple):
+    """
+    Cheapest and most expensive way to buy a deck.
+
+    Attributes
+    ----------
+    cheapest : dict[str, PrintingPrice]
+        Cheapest offer per deck card uuid.
+    min_total, max_total : Decimal
+        Sum of quantity × cheapest / most expensive price over the priced cards.
+    currency : str | None
+        Currency of the totals.
+    missing : list[str]
+        Deck card uuids without any offer.
+    """
+
+    cheapest: dict
+    min_total: Decimal
+    max_total: Decimal
+    currency: Optional[str]
+    missing: list
+
+
+def deck_quantities(deck: dict) -> dict[str, int]:
+    """Quantity per card uuid of a deck, commanders included."""
+    quantities = dict(deck.get("cards") or {})
+    for uuid in deck.get("commander") or []:
+        quantities[uuid] = quantities.get(uuid, 0) + 1
+    return quantities
+
+
+def format_price(amount, currency: Optional[str]) -> str:
+    """Format an amount as e.g. "$12.34" (or "12.34 GBP" for currencies without a symbol)."""
+    symbol = CURRENCY_SYMBOLS.get(currency or "USD")
+    return f"{symbol}{amount:,.2f}" if symbol else f"{amount:,.2f} {currency}"
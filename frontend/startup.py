@@ -0,0 +1,60 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# ⏱️ Seconds spent per startup step, in the order they ran (e.g. {"import logic": 0.41})
+timings: dict[str, float] = {}
+
+# ✅ Set once the background warm-up has finished (successfully or not)
+ready = threading.Event()
+
+# Reference point for "time since process start" in the report
+_started = time.perf_counter()
+
+# The warm-up thread, once warm_up() has been called
+_warm_up_thread = None
+
+
+@contextmanager
+def timed(label: str):
+    """Record how long the wrapped block takes under ``label``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[label] = time.perf_counter() - start
+
+
+def report() -> str:
+    """Return a one-line summary of where startup time went."""
+    steps = ", ".join(f"{label}: {seconds * 1000:.0f} ms" for label, seconds in timings.items())
+    return f"[startup] {steps} (total {time.perf_counter() - _started:.2f} s)"
+
+
+def is_ready() -> bool:
+    """True once the warm-up has finished, or if none was started (everything then loads lazily)."""
+    return ready.is_set() or _warm_up_thread is None
+
+
+def warm_up(*steps) -> threading.Thread:
+    """
+    Run ``(label, callable)`` steps on a background thread and set ``ready`` when done.
+
+    The caller returns immediately, so the server can start listening (and serve the
+    login page) while the database connects and the catalog loads. A failing step is
+    reported and skipped; whatever it initializes is retried lazily on first use.
+    """
+    def run():
+        for label, step in steps:
+            try:
+                with timed(label):
+                    step()
+            except Exception as e:
+                print(f"[startup] {label} failed: {e}")
+        ready.set()
+        print(report())
+
+    global _warm_up_thread
+    _warm_up_thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    _warm_up_thread.start()
+    return _warm_up_thread
@@ -69,6 +69,12 @@ def card_search_ui():
 
         ui.input_text("filter_subtype", "Subtype contains"),
         ui.input_text("filter_flavor", "Text contains"),
+        ui.input_select(
+            "search_page_size",
+            "Results per page",
+            choices={"25": "25", "50": "50", "100": "100", "200": "200"},
+            selected="50"
+        ),
 
         ui.hr(),
         ui.output_ui("filtered_card_list")
@@ -105,6 +111,12 @@ def deck_view_ui(deck_name):
                             ui.output_text("deck_card_counter"),
                             style="font-size: 1.2rem; font-weight: bold;"
                         ),
+                        # 💰 Cheapest – most expensive printings total
+                        ui.span(
+                            ui.output_text("deck_price_range"),
+                            title="Cheapest and most expensive printings",
+                            style="font-size: 1.2rem;"
+                        ),
                         ui.input_action_button("back_to_decks", "← Back to Deck List"),
                     ],
                     style="display: flex; gap: 1rem; align-items: center;"
@@ -194,6 +206,11 @@ app_ui = ui.page_fluid(
                     Shiny.setInputValue('deck_search', "", {priority: 'event'});
                 }
             }
+            if (e.target.classList.contains('set-page')) {
+                e.preventDefault();
+                const page = parseInt(e.target.dataset.page);
+                Shiny.setInputValue(e.target.dataset.input, page, {priority: 'event'});
+            }
             if (e.target.classList.contains('add-card-btn')) {
                 const cardName = e.target.dataset.card;
                 Shiny.setInputValue('add_selected_card', cardName, {priority: 'event'});
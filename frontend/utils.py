@@ -1,9 +1,19 @@
+import asyncio
 import os
 import json
 import pathlib
-import re
-from datetime import datetime
-from dbmanager import DBManager
+import threading
+from collections import OrderedDict
+from analytics import DeckSummary, SummaryCache, summarize_deck
+from dbmanager import DBManager, AsyncDBManager
+from decks import DeckStore, JsonDeckStore, PostgresDeckStore
+from card import CardRecord
+from catalog import CardCatalog
+from commanders import CommanderIndex
+from filters import CardFilter
+from mana import mana_cost_html, rules_text_html
+from prices import PRICE_FINISH, PRICE_VENDOR, DeckPriceRange, DeckValue, deck_quantities
+import columnar
 from shiny import ui
 
 # === Path Configuration ===
@@ -20,25 +30,11 @@ USERS_FILE = DATA_DIR / "users.json"
 # Directory containing decks per user
 DECKS_DIR = DATA_DIR / "decks"
 
-# Ensure data directories exist
-os.makedirs(DECKS_DIR, exist_ok=True)
-
-# Initialize users.json if it doesn't exist
-if not USERS_FILE.exists():
-    with open(USERS_FILE, "w") as file:
-        json.dump({}, file)
-
 # === Utility Functions ===
 
-def mana_symbol_to_filename(symbol: str) -> str:
-    """Convert mana symbol to corresponding filename."""
-    if "/" in symbol:
-        return symbol.replace("/", "").upper()
-    elif symbol.isdigit():
-        return symbol
-    elif symbol.upper() in {"X", "Y", "Z"}:
-        return f"C_{symbol.upper()}"
-    return symbol.upper()
+def ensure_data_dirs() -> None:
+    """Create the data directories on first write instead of at import time."""
+    os.makedirs(DATA_DIR, exist_ok=True)
 
 # === User Management ===
 
@@ -47,114 +43,240 @@ def load_users() -> dict:
     try:
         with open(USERS_FILE, "r") as file:
             return json.load(file)
-    except json.JSONDecodeError:
+    except (FileNotFoundError, json.JSONDecodeError):
         return {}
 
 def save_users(users: dict) -> None:
     """Save user credentials to JSON file."""
+    ensure_data_dirs()
     with open(USERS_FILE, "w") as file:
         json.dump(users, file)
 
 # === Deck Management ===
 
-def get_deck_file(username: str) -> pathlib.Path:
-    """Return the deck file path for a given user."""
-    return DECKS_DIR / f"{username}.json"
+# Where decks are kept: "json" (one file per user in DECKS_DIR, the default) or "postgres"
+DECK_STORE = os.getenv("DECK_STORE", "json")
+
+def get_deck_store() -> DeckStore:
+    """Return the configured deck store (created on first use)."""
+    global _deck_store
+    if _deck_store is None:
+        _deck_store = PostgresDeckStore(get_db) if DECK_STORE == "postgres" else JsonDeckStore(DECKS_DIR)
+    return _deck_store
+
+_deck_store = None
 
 def load_decks(username: str) -> dict:
-    """Load all decks for a given user. Auto-upgrade old formats if needed."""
-    file_path = get_deck_file(username)
-    try:
-        with open(file_path, "r") as file:
-            decks = json.load(file)
-            if isinstance(decks, list):
-                decks = {name: [] for name in decks}
-                save_decks(username, decks)
-            return decks
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+    """Load all decks for a given user."""
+    return get_deck_store().load_decks(username)
 
 def save_decks(username: str, decks: dict) -> None:
-    """Save all decks of a user to file."""
-    with open(get_deck_file(username), "w") as file:
-        json.dump(decks, file)
+    """Replace all decks of a user."""
+    get_deck_store().save_decks(username, decks)
 
 def get_deck_cards(username: str, deck_name: str) -> list:
-    """Get all cards from a specific deck."""
-    decks = load_decks(username)
-    if isinstance(decks.get(deck_name), dict):
-        return decks[deck_name].get("cards", [])
-    return decks.get(deck_name, [])
+    """Get the (card, quantity) pairs of a specific deck."""
+    return resolve_deck(load_decks(username).get(deck_name) or {})[1]
 
 def add_card_to_deck(username: str, deck_name: str, card_name: str) -> None:
     """Add a card to a deck if it is not already present."""
-    decks = load_decks(username)
-    decks.setdefault(deck_name, {"cards": [], "commander": [], "updated_at": None})
+    store = get_deck_store()
+    store.create_deck(username, deck_name)
 
     match = find_card_by_name(card_name)
     if not match:
         return
 
-    existing_names = {c.get("name") for c in decks[deck_name]["cards"]}
+    existing_names = {card.get("name") for card, _ in get_deck_cards(username, deck_name)}
     if card_name not in existing_names:
-        decks[deck_name]["cards"].append(match)
-        decks[deck_name]["updated_at"] = datetime.utcnow().isoformat()
-        save_decks(username, decks)
+        store.add_card(username, deck_name, match["uuid"])
 
 # === Database Access ===
 
-_password = os.environ.get("DB_PASSWORD")
-_db = DBManager(dbname="mtgbase", user="postgres", password=_password)
+_db = None
+_db_lock = threading.Lock()
+
+def get_db() -> DBManager:
+    """Return the shared DBManager, connecting on first use rather than at import time."""
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = DBManager(
+                    dbname="mtgbase",
+                    user="postgres",
+                    password=os.environ.get("DB_PASSWORD"),
+                    minconn=int(os.environ.get("DB_POOL_MIN", 1)),
+                    maxconn=int(os.environ.get("DB_POOL_MAX", 10)),
+                )
+    return _db
+
+# Awaitable wrapper so reactive code never blocks the event loop on a query;
+# get_db() is only called on its worker threads
+_adb = AsyncDBManager(get_db, max_workers=int(os.environ.get("DB_POOL_MAX", 10)))
+
+# Shared across all sessions; empty search returns all distinct names
+catalog = CardCatalog(lambda: get_db().get_cards_by_name(""))
+
+def get_all_cards() -> list[CardRecord]:
+    """Return one version per card name from the in-process catalog cache."""
+    return catalog.cards()
+
+async def get_all_cards_async() -> list[CardRecord]:
+    """Awaitable get_all_cards(); a (re)load of the catalog runs off the event loop."""
+    return await _adb.run(catalog.cards)
+
+def find_card_by_name(name: str) -> CardRecord | None:
+    """Find the card with exactly this name: catalog cache first, then an indexed DB lookup."""
+    return catalog.get(name) or get_db().get_card_by_name(name)
+
+async def find_card_by_name_async(name: str) -> CardRecord | None:
+    """Awaitable find_card_by_name(); a catalog load or DB lookup runs off the event loop."""
+    return await _adb.run(find_card_by_name, name)
+
+# Printings referenced by decks that are not the catalog's printing (e.g. decks saved before a reload),
+# least recently used first; bounded, and dropped whenever the catalog reloads
+PRINTINGS_CACHE_SIZE = 4096
+_printings: OrderedDict[str, CardRecord] = OrderedDict()
+_printings_version = None
+_printings_lock = threading.Lock()
+
+def resolve_cards(uuids) -> dict[str, CardRecord]:
+    """Look up cards by uuid: catalog cache first, then cached printings, then one batched query for the rest."""
+    global _printings_version
+    snapshot = catalog.snapshot()
+    found = {uuid: card for uuid in uuids if (card := snapshot.by_uuid.get(uuid)) is not None}
+    missing = []
+    with _printings_lock:
+        if _printings_version != snapshot.version:
+            _printings.clear()
+            _printings_version = snapshot.version
+        for uuid in uuids:
+            if uuid in found:
+                continue
+            if uuid in _printings:
+                _printings.move_to_end(uuid)
+                found[uuid] = _printings[uuid]
+            else:
+                missing.append(uuid)
+    if missing:
+        cards = get_db().get_cards_by_uuid(missing)
+        with _printings_lock:
+            for card in cards:
+                found[card["uuid"]] = _printings[card["uuid"]] = card
+                _printings.move_to_end(card["uuid"])
+            while len(_printings) > PRINTINGS_CACHE_SIZE:
+                _printings.popitem(last=False)
+    return found
+
+def resolve_commanders(deck: dict) -> list[CardRecord]:
+    """Return the commander cards of a deck."""
+    commanders = deck.get("commander") or []
+    found = resolve_cards(commanders)
+    return [found[uuid] for uuid in commanders if uuid in found]
+
+async def resolve_commanders_async(deck: dict) -> list[CardRecord]:
+    """Awaitable resolve_commanders()."""
+    return await _adb.run(resolve_commanders, deck)
+
+def resolve_deck(deck: dict) -> tuple[list[CardRecord], list[tuple[CardRecord, int]]]:
+    """Return a deck's commanders and its (card, quantity) pairs, resolved in one pass."""
+    commanders = deck.get("commander") or []
+    cards = deck.get("cards") or {}
+    found = resolve_cards([*commanders, *cards])
+    return ([found[uuid] for uuid in commanders if uuid in found],
+            [(found[uuid], quantity) for uuid, quantity in cards.items() if uuid in found])
+
+async def resolve_deck_async(deck: dict) -> tuple[list[CardRecord], list[tuple[CardRecord, int]]]:
+    """Awaitable resolve_deck()."""
+    return await _adb.run(resolve_deck, deck)
+
+# Deck summaries (curve, pips, type counts, ...) rebuilt only when a deck or the catalog changes
+_summaries = SummaryCache()
+
+def get_deck_summary(username: str, deck_name: str, deck: dict) -> DeckSummary:
+    """Return the analytics summary of a deck, cached per deck revision (``updated_at``)."""
+    revision = (deck.get("updated_at"), catalog.version)
+    return _summaries.get((username, deck_name), revision, lambda: summarize_deck(*resolve_deck(deck)))
+
+async def get_deck_summary_async(username: str, deck_name: str, deck: dict) -> DeckSummary:
+    """Awaitable get_deck_summary(); resolving the deck's cards runs off the event loop."""
+    return await _adb.run(get_deck_summary, username, deck_name, deck)
+
+def find_cards(card_filter: CardFilter, limit: int | None = None, offset: int = 0) -> list[CardRecord]:
+    """Run a card search in the database, returning only the requested slice of matches."""
+    return get_db().find_cards(card_filter, limit=limit, offset=offset)
+
+def count_cards(card_filter: CardFilter) -> int:
+    """Return the total number of matches for a card search."""
+    return get_db().count_cards(card_filter)
+
+# Opt-in (CATALOG_COLUMNAR=1, needs numpy): filter the in-memory catalog with NumPy masks
+# instead of querying the database
+COLUMNAR_SEARCH = columnar.available and os.environ.get("CATALOG_COLUMNAR", "0") == "1"
+_columnar = None
+
+def get_columnar_catalog() -> columnar.ColumnarCatalog:
+    """Return the columnar view of the catalog, rebuilding it whenever the catalog reloads."""
+    global _columnar
+    snapshot = catalog.snapshot()
+    if _columnar is None or _columnar.version != snapshot.version:
+        _columnar = columnar.ColumnarCatalog(snapshot.cards, version=snapshot.version)
+    return _columnar
+
+_commanders = None
+
+def get_commander_index() -> CommanderIndex:
+    """Return the commander candidate index, rebuilding it whenever the catalog reloads."""
+    global _commanders
+    snapshot = catalog.snapshot()
+    if _commanders is None or _commanders.version != snapshot.version:
+        _commanders = CommanderIndex(snapshot.cards, version=snapshot.version)
+    return _commanders
+
+async def find_commander_candidates_async(stage: str, name_filter: str = "") -> list[CardRecord]:
+    """Eligible cards for a commander search stage whose name contains ``name_filter``."""
+    return await _adb.run(lambda: get_commander_index().search(stage, name_filter))
+
+async def search_cards_async(card_filter: CardFilter, limit: int | None = None,
+                             offset: int = 0) -> tuple[int, list[CardRecord]]:
+    """Return the total number of matches and one page of them, from the fastest enabled backend."""
+    if COLUMNAR_SEARCH:
+        return await _adb.run(lambda: get_columnar_catalog().search(card_filter, limit, offset))
+    total, cards = await asyncio.gather(
+        count_cards_async(card_filter),
+        find_cards_async(card_filter, limit=limit, offset=offset),
+    )
+    return total, cards
+
+async def get_deck_values_async(decks: dict) -> dict[str, DeckValue]:
+    """Value every deck of a user (``{deck_name: deck}``) with one batched price query."""
+    quantities = {name: deck_quantities(deck) for name, deck in decks.items()}
+    values = await _adb.get_deck_values(quantities, PRICE_VENDOR, PRICE_FINISH)
+    return {name: values.get(name, DeckValue()) for name in decks}
 
-def get_all_cards() -> list[dict]:
-    """Fetch one version per card name from the database."""
-    return _db.get_cards_by_name("")  # Empty search returns all distinct names
+async def get_deck_price_range_async(deck: dict) -> DeckPriceRange:
+    """Cheapest and most expensive printing of every card in a deck at PRICE_VENDOR, in one query."""
+    return await _adb.get_deck_price_range(deck_quantities(deck), [PRICE_VENDOR])
 
-def find_card_by_name(name: str) -> dict | None:
-    """Find a single unique card by name using DB directly."""
-    return _db.get_cards_by_name(name)[0] if _db.get_cards_by_name(name) else None
+async def find_cards_async(card_filter: CardFilter, limit: int | None = None, offset: int = 0) -> list[CardRecord]:
+    """Awaitable find_cards()."""
+    return await _adb.find_cards(card_filter, limit=limit, offset=offset)
+
+async def count_cards_async(card_filter: CardFilter) -> int:
+    """Awaitable count_cards()."""
+    return await _adb.count_cards(card_filter)
 
 
 # === UI Rendering ===
 
 def render_mana_cost(mana_cost_str: str):
-    """Render mana cost string into icon images."""
-    if not mana_cost_str:
-        return ""
-
-    parts = mana_cost_str.replace("{", "").split("}")
-    icons = [mana_symbol_to_filename(part) for part in parts if part]
-
-    return ui.span(*[
-        ui.img(
-            src=f"/icons/{symbol}.svg",
-            height="16px",
-            style="vertical-align: middle; margin-right: 2px;",
-            title=symbol
-        ) for symbol in icons
-    ])
+    """Render mana cost string into icon images (HTML cached per distinct cost)."""
+    return ui.HTML(mana_cost_html(mana_cost_str))
 
 def render_text_with_icons(text: str):
-    """Replace mana symbols in card text with corresponding icons."""
-    if not text:
-        return ""
-
-    text = (
-        text.replace("â€”", "—")
-            .replace("â€™", "’")
-            .replace("\\n", "\n")
-            .replace("\n", "<br>")
-            .replace("â€¢", "*")
-            .replace("âˆ’", "-")
-    )
-
-    def replace_symbol(match):
-        symbol = match.group(1)
-        filename = mana_symbol_to_filename(symbol)
-        return f"<img src='/icons/{filename}.svg' title='{symbol}' height='16px' style='vertical-align: middle; margin-right: 2px;'/>"
-
-    html = re.sub(r"\{([^}]+)\}", replace_symbol, text)
-    return ui.HTML(html)
+    """Replace mana symbols in card text with corresponding icons (HTML cached per distinct text)."""
+    return ui.HTML(rules_text_html(text))
 
 def render_card_list(cards: list, add_button_class: str = "add-card-btn"):
     """Render an HTML table of cards with add buttons."""
@@ -183,6 +305,27 @@ def render_card_list(cards: list, add_button_class: str = "add-card-btn"):
         headers,
         *rows
     )
+def render_pager(page_input: str, page: int, page_size: int, total: int):
+    """Render "previous / next" links and the visible range for a paginated table."""
+    if total <= page_size:
+        return ui.div(f"{total} result(s)", style="margin-top: 1em;")
+
+    last_page = (total - 1) // page_size
+    first, last = page * page_size + 1, min((page + 1) * page_size, total)
+
+    def page_link(label, target, enabled):
+        if not enabled:
+            return ui.span(label, style="color: #aaa;")
+        return ui.a(label, href="#", class_="set-page",
+                    **{"data-input": page_input, "data-page": str(target)})
+
+    return ui.div(
+        page_link("← Previous", page - 1, page > 0),
+        ui.span(f"{first}–{last} of {total}"),
+        page_link("Next →", page + 1, page < last_page),
+        style="display: flex; gap: 1rem; align-items: center; margin-top: 1em;"
+    )
+
 def is_basic_land(card):
     return (
         "Land" in (card.get("types") or []) and
@@ -1 +1,422 @@
-#dit is leeg
\ No newline at end of file
+"""
+Load MTGJSON's AllPrintings.json into the ``cards`` table (database/create_tables.sql).
+
+The file is several GB, so it is never loaded as a whole: sets are streamed one at a
+time with an incremental JSON parser, every card is mapped to one ``cards`` row, and rows
+are bulk-loaded with ``COPY ... FROM STDIN`` in fixed-size batches. Peak memory is one set
+plus one batch.
+
+Cards are mapped to COPY lines per set on a pool of worker processes (``--workers``); the
+main process only parses the JSON stream and feeds one COPY writer.
+
+A full load replaces the table. ``--incremental`` instead copies the release into a staging
+table and upserts only printings whose content hash changed (new sets, errata), keyed on
+``uuid``. Every load is recorded in ``catalog_sync`` with the MTGJSON version and date, and
+refreshes the ``oracle_cards`` materialized view the frontend searches.
+
+Usage:
+    python parse_mtg_data.py path/to/AllPrintings.json [--incremental] [--workers 4] [--batch-size 5000] [--sets 10E,M21]
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import ijson
+import psycopg2
+
+# Columns of the ``cards`` table filled from MTGJSON, in create_tables.sql order.
+# MTGJSON card keys use the same (camelCase) names; ``id`` is left to the SERIAL default.
+CARD_COLUMNS = (
+    "artist", "artistIds", "asciiName", "attractionLights", "availability",
+    "boosterTypes", "borderColor", "cardParts", "colorIdentity", "colorIndicator",
+    "colors", "defense", "duelDeck", "edhrecRank", "edhrecSaltiness",
+    "faceConvertedManaCost", "faceFlavorName", "faceManaValue", "faceName", "finishes",
+    "flavorName", "flavorText", "frameEffects", "frameVersion", "hand",
+    "hasAlternativeDeckLimit", "hasContentWarning", "hasFoil", "hasNonFoil", "isAlternative",
+    "isFullArt", "isFunny", "isGameChanger", "isOnlineOnly", "isOversized",
+    "isPromo", "isRebalanced", "isReprint", "isReserved", "isStarter",
+    "isStorySpotlight", "isTextless", "isTimeshifted", "keywords", "language",
+    "layout", "leadershipSkills", "life", "loyalty", "manaCost",
+    "manaValue", "name", "number", "originalPrintings", "originalReleaseDate",
+    "originalText", "originalType", "otherFaceIds", "power", "printings",
+    "promoTypes", "rarity", "rebalancedPrintings", "relatedCards", "securityStamp",
+    "setCode", "side", "signature", "sourceProducts", "subsets",
+    "subtypes", "supertypes", "text", "toughness", "type",
+    "types", "uuid", "variations", "watermark",
+)
+
+# Columns written by the loader: the card columns plus the hash of their values
+LOAD_COLUMNS = CARD_COLUMNS + ("content_hash",)
+
+# Rows sent per COPY statement
+DEFAULT_BATCH_SIZE = 5000
+
+# Worker processes transforming sets
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+
+# --- Reading ---
+
+def iter_sets(json_file, set_codes=None):
+    """
+    Yield ``(set_code, set_data)`` pairs from AllPrintings.json, one set at a time.
+
+    Parameters
+    ----------
+    json_file : str
+        Path to AllPrintings.json.
+    set_codes : set[str], optional
+        Only yield these sets (default is every set).
+    """
+    with open(json_file, "rb") as file:
+        for set_code, set_data in ijson.kvitems(file, "data", use_float=True):
+            if set_codes and set_code not in set_codes:
+                continue
+            yield set_code, set_data
+
+
+def read_meta(json_file) -> dict:
+    """Return AllPrintings' ``meta`` object (version and date of the release)."""
+    with open(json_file, "rb") as file:
+        # "meta" precedes "data", so this stops long before the end of the file
+        return next(ijson.items(file, "meta"), {})
+
+
+# --- Mapping ---
+
+# Mis-decoded UTF-8 and escaped line breaks seen in older exports, repaired once at load
+# time so the frontend can render rules text as stored.
+TEXT_FIXES = (
+    ("â€”", "—"),
+    ("â€™", "’"),
+    ("â€¢", "*"),
+    ("âˆ’", "-"),
+    ("\\n", "\n"),
+)
+
+
+def normalize_text(value: str) -> str:
+    """Repair mojibake and literal "\\n" sequences in a card string."""
+    for broken, fixed in TEXT_FIXES:
+        if broken in value:
+            value = value.replace(broken, fixed)
+    return value
+
+
+def to_db_value(value):
+    """Flatten an MTGJSON value into what the TEXT/number/boolean columns store."""
+    if isinstance(value, str):
+        return normalize_text(value)
+    if isinstance(value, list):
+        # e.g. ["Creature", "Artifact"] -> "Creature, Artifact" (what the frontend splits on)
+        return normalize_text(", ".join(str(v) for v in value))
+    if isinstance(value, dict):
+        return json.dumps(value, sort_keys=True)
+    return value
+
+
+def card_to_row(card: dict) -> tuple:
+    """Map one MTGJSON card object to a tuple of values in CARD_COLUMNS order."""
+    return tuple(to_db_value(card.get(column)) for column in CARD_COLUMNS)
+
+
+# --- Writing ---
+
+def copy_escape(value) -> str:
+    """Encode one value for PostgreSQL's COPY text format."""
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def format_copy_line(row: tuple) -> str:
+    return "\t".join(copy_escape(value) for value in row) + "\n"
+
+
+def format_card_line(card: dict) -> str:
+    """Return the COPY line (LOAD_COLUMNS order) for one MTGJSON card, ending in its content hash."""
+    values = "\t".join(copy_escape(value) for value in card_to_row(card))
+    content_hash = hashlib.md5(values.encode("utf-8")).hexdigest()
+    return f"{values}\t{content_hash}\n"
+
+
+class CopyWriter:
+    """
+    Buffers rows and sends them to a table with ``COPY ... FROM STDIN`` every ``batch_size`` rows.
+
+    Parameters
+    ----------
+    cur : psycopg2.extensions.cursor
+        Cursor of the connection (and transaction) to load into.
+    table : str
+        Target table name.
+    columns : tuple[str]
+        Target columns, in row order.
+    batch_size : int, optional
+        Rows per COPY statement (default is DEFAULT_BATCH_SIZE).
+    """
+
+    def __init__(self, cur, table, columns, batch_size=DEFAULT_BATCH_SIZE):
+        self.cur = cur
+        self.statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+        self.batch_size = batch_size
+        self.buffer = io.StringIO()
+        self.pending = 0
+        self.written = 0
+
+    def write_line(self, line: str) -> None:
+        """Queue one already formatted COPY line."""
+        self.buffer.write(line)
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def write_row(self, row: tuple) -> None:
+        self.write_line(format_copy_line(row))
+
+    def write_block(self, block: str, rows: int) -> None:
+        """Queue ``rows`` already formatted COPY lines joined into one string."""
+        self.buffer.write(block)
+        self.pending += rows
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        self.buffer.seek(0)
+        self.cur.copy_expert(self.statement, self.buffer)
+        self.written += self.pending
+        self.buffer = io.StringIO()
+        self.pending = 0
+
+
+# --- Pipeline ---
+
+def transform_set(set_code, cards):
+    """
+    Validate and map one set's cards to COPY lines; runs in a worker process.
+
+    Cards without a ``uuid`` or ``name`` cannot be stored and are skipped.
+
+    Returns
+    -------
+    tuple[str, str, int, int]
+        Set code, the joined COPY lines, the number of rows and the number of skipped cards.
+    """
+    lines = [format_card_line(card) for card in cards if card.get("uuid") and card.get("name")]
+    return set_code, "".join(lines), len(lines), len(cards) - len(lines)
+
+
+def iter_transformed_sets(json_file, set_codes=None, workers=DEFAULT_WORKERS):
+    """
+    Yield ``transform_set`` results in file order, fanning the sets out over ``workers`` processes.
+
+    At most two sets per worker are in flight, so memory stays bounded however far the
+    parser gets ahead of the workers.
+    """
+    if workers <= 1:
+        for set_code, set_data in iter_sets(json_file, set_codes):
+            yield transform_set(set_code, set_data.get("cards", []))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for set_code, set_data in iter_sets(json_file, set_codes):
+            pending.append(pool.submit(transform_set, set_code, set_data.get("cards", [])))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _write_sets(writer, json_file, set_codes, workers, started) -> None:
+    for set_code, block, rows, skipped in iter_transformed_sets(json_file, set_codes, workers):
+        writer.write_block(block, rows)
+        note = f", {skipped} skipped" if skipped else ""
+        print(f"[{set_code}] {rows} cards{note} "
+              f"(total {writer.written + writer.pending}, {time.perf_counter() - started:.1f}s)")
+    writer.flush()
+
+
+def record_sync(cur, meta, mode, inserted, updated) -> None:
+    cur.execute(
+        """
+        INSERT INTO catalog_sync (source_version, source_date, mode, rows_inserted, rows_updated)
+        VALUES (%s, %s, %s, %s, %s)
+        """,
+        (meta.get("version"), meta.get("date"), mode, inserted, updated)
+    )
+
+
+# (colorIdentity, manaCost, expected WUBRG mask of both) checked against the generated mask columns
+MASK_CHECKS = (
+    ("W", "{W}", 1), ("U", "{U}", 2), ("B", "{B}", 4), ("R", "{R}", 8), ("G", "{G}", 16),
+    ("W, U, B, R, G", "{W}{U}{B}{R}{G}", 31), ("U, R", "{2}{U/R}", 10), ("", "{3}", 0),
+)
+
+
+def check_color_masks(cur) -> None:
+    """
+    Check the generated ``color_identity_mask`` / ``mana_cost_mask`` of ``cards`` on known colors.
+
+    The expressions are evaluated on a scratch copy of the table definition, before anything
+    is loaded, so a schema computing wrong masks stops the load instead of silently breaking
+    every color filter.
+
+    Raises
+    ------
+    RuntimeError
+        If any mask differs from MASK_CHECKS.
+    """
+    cur.execute("CREATE TEMP TABLE cards_mask_check (LIKE cards INCLUDING GENERATED) ON COMMIT DROP;")
+    cur.executemany(
+        "INSERT INTO cards_mask_check (id, uuid, colorIdentity, manaCost) VALUES (%s, %s, %s, %s);",
+        [(n, str(n), identity, cost) for n, (identity, cost, _) in enumerate(MASK_CHECKS)]
+    )
+    cur.execute("SELECT color_identity_mask, mana_cost_mask FROM cards_mask_check ORDER BY id;")
+    wrong = [f"{identity!r}/{cost!r}: got {masks}, expected {expected}"
+             for (identity, cost, expected), masks in zip(MASK_CHECKS, cur.fetchall())
+             if masks != (expected, expected)]
+    if wrong:
+        raise RuntimeError(
+            "cards computes wrong color masks (" + "; ".join(wrong) + "). "
+            "Recreate the tables with database/create_tables.sql and reload the card data.")
+
+
+def refresh_oracle_cards(cur) -> None:
+    """Rebuild the one-printing-per-name view; CONCURRENTLY keeps it readable meanwhile."""
+    cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY oracle_cards;")
+
+
+def load_all_printings(conn, json_file, batch_size=DEFAULT_BATCH_SIZE, set_codes=None,
+                       workers=DEFAULT_WORKERS):
+    """
+    Replace the contents of ``cards`` with every printing in AllPrintings.json.
+
+    Runs in a single transaction: readers keep seeing the old catalog until the load commits,
+    and a failed load leaves it untouched. The old rows are removed with DELETE, not TRUNCATE:
+    TRUNCATE takes an ACCESS EXCLUSIVE lock that would block every reader of ``cards`` (deck
+    lookups, price queries, the view refresh) for the whole COPY, while DELETE only conflicts
+    with other writers. The deleted rows are reclaimed by (auto)vacuum after the commit.
+
+    Returns
+    -------
+    int
+        Number of rows loaded.
+    """
+    started = time.perf_counter()
+    meta = read_meta(json_file)
+    with conn:
+        with conn.cursor() as cur:
+            check_color_masks(cur)
+            cur.execute("DELETE FROM cards;")
+            writer = CopyWriter(cur, "cards", LOAD_COLUMNS, batch_size)
+            _write_sets(writer, json_file, set_codes, workers, started)
+            refresh_oracle_cards(cur)
+            record_sync(cur, meta, "full", writer.written, 0)
+    return writer.written
+
+
+def sync_all_printings(conn, json_file, batch_size=DEFAULT_BATCH_SIZE, set_codes=None,
+                       workers=DEFAULT_WORKERS):
+    """
+    Bring ``cards`` up to date with AllPrintings.json, touching only new or changed printings.
+
+    The release is copied into a temporary staging table; rows whose ``(uuid, content_hash)``
+    already exists in ``cards`` are skipped and the rest are upserted with
+    ``INSERT ... ON CONFLICT (uuid)``. Printings keep their ``id``.
+
+    Returns
+    -------
+    tuple[int, int]
+        Number of rows inserted and updated.
+    """
+    started = time.perf_counter()
+    meta = read_meta(json_file)
+    columns = ", ".join(LOAD_COLUMNS)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in LOAD_COLUMNS if column != "uuid")
+    with conn:
+        with conn.cursor() as cur:
+            check_color_masks(cur)
+            cur.execute(f"""
+                CREATE TEMP TABLE cards_staging ON COMMIT DROP AS
+                SELECT {columns} FROM cards WITH NO DATA;
+            """)
+            writer = CopyWriter(cur, "cards_staging", LOAD_COLUMNS, batch_size)
+            _write_sets(writer, json_file, set_codes, workers, started)
+            cur.execute(f"""
+                WITH changed AS (
+                    SELECT s.*
+                    FROM cards_staging s
+                    LEFT JOIN cards c ON c.uuid = s.uuid
+                    WHERE c.content_hash IS DISTINCT FROM s.content_hash
+                ), upserted AS (
+                    INSERT INTO cards ({columns})
+                    SELECT {columns} FROM changed
+                    ON CONFLICT (uuid) DO UPDATE SET {updates}
+                    RETURNING (xmax = 0) AS inserted
+                )
+                SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted)
+                FROM upserted;
+            """)
+            inserted, updated = cur.fetchone()
+            if inserted or updated:
+                refresh_oracle_cards(cur)
+            record_sync(cur, meta, "incremental", inserted, updated)
+    print(f"Compared {writer.written} printings in {time.perf_counter() - started:.1f}s.")
+    return inserted, updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load MTGJSON AllPrintings.json into the cards table.")
+    parser.add_argument("json_file", help="Path to AllPrintings.json")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Upsert only new or changed printings instead of reloading the table")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Worker processes transforming sets (1 = no pool)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per COPY statement")
+    parser.add_argument("--sets", help="Comma-separated set codes to load (default: all)")
+    parser.add_argument("--dbname", default="mtgbase")
+    parser.add_argument("--user", default="postgres")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", default="5432")
+    args = parser.parse_args()
+
+    password = os.environ.get("DB_PASSWORD")
+    if not password:
+        # Fail fast with a clear error message
+        raise ValueError(
+            "No database password supplied. Please set the DB_PASSWORD environment variable:\n"
+            "Windows: set DB_PASSWORD=your_password\n"
+            "Linux/Mac: export DB_PASSWORD=your_password")
+
+    set_codes = {code.strip().upper() for code in args.sets.split(",")} if args.sets else None
+    conn = psycopg2.connect(dbname=args.dbname, user=args.user, password=password,
+                            host=args.host, port=args.port)
+    try:
+        if args.incremental:
+            inserted, updated = sync_all_printings(conn, args.json_file, args.batch_size, set_codes, args.workers)
+            print(f"Inserted {inserted} and updated {updated} cards.")
+        else:
+            total = load_all_printings(conn, args.json_file, args.batch_size, set_codes, args.workers)
+            print(f"Loaded {total} cards.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Load MTGJSON's AllPrices.json (or AllPricesToday.json) into the ``card_prices`` table
+(database/create_tables.sql).
+
+Prices are keyed by card uuid, so they join directly to ``cards`` and to the uuids decks
+store. The file is streamed one card at a time; every ``paper`` price point
+(vendor, finish, date) becomes one row, bulk-loaded with ``COPY`` into a staging table and
+upserted, so re-importing overlapping days only overwrites those days.
+
+History is partitioned by month: the partitions a file needs are created before the upsert,
+and ``card_prices_current`` is moved forward to each printing's newest price in the same
+transaction. Old history can be thinned to one point per week (``--keep-daily-days``) and
+whole months dropped (``--retain-months``); both also run without a file.
+
+Usage:
+    python parse_mtg_prices.py path/to/AllPrices.json [--price-type retail] [--vendors tcgplayer,cardmarket]
+    python parse_mtg_prices.py [path/to/AllPricesToday.json] --keep-daily-days 90 --retain-months 36
+"""
+import argparse
+import os
+import re
+import time
+from datetime import date, timedelta
+
+import ijson
+import psycopg2
+
+from parse_mtg_data import DEFAULT_BATCH_SIZE, CopyWriter, read_meta
+
+# Columns of ``card_prices`` filled by the importer, in row order
+PRICE_COLUMNS = ("uuid", "vendor", "finish", "price_date", "price", "currency")
+
+# Print progress every this many price points
+PROGRESS_EVERY = 1_000_000
+
+
+# --- Reading ---
+
+def iter_price_rows(json_file, price_type="retail", vendors=None):
+    """
+    Yield one ``PRICE_COLUMNS`` tuple per paper price point in an AllPrices-style file.
+
+    The layout is ``data[uuid]["paper"][vendor][price_type][finish][date] = price``, with
+    the vendor's ``currency`` next to its price types.
+
+    Parameters
+    ----------
+    json_file : str
+        Path to AllPrices.json or AllPricesToday.json.
+    price_type : str, optional
+        "retail" (what a player pays, the default) or "buylist".
+    vendors : set[str], optional
+        Only yield these vendors (default is every vendor).
+    """
+    with open(json_file, "rb") as file:
+        for uuid, formats in ijson.kvitems(file, "data"):
+            for vendor, prices in (formats.get("paper") or {}).items():
+                if vendors and vendor not in vendors:
+                    continue
+                currency = prices.get("currency", "USD")
+                for finish, points in (prices.get(price_type) or {}).items():
+                    for price_date, price in points.items():
+                        if price is not None:
+                            yield uuid, vendor, finish, price_date, price, currency
+
+
+# --- Partitions ---
+
+def partition_name(month: date) -> str:
+    """Name of the ``card_prices`` partition holding ``month`` (e.g. card_prices_y2025m06)."""
+    return f"card_prices_y{month.year:04d}m{month.month:02d}"
+
+
+def next_month(month: date) -> date:
+    return (month.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def ensure_partitions(cur, first: date, last: date) -> None:
+    """Create the monthly ``card_prices`` partitions covering ``first`` .. ``last``."""
+    month = first.replace(day=1)
+    while month <= last:
+        cur.execute(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF card_prices "
+            f"FOR VALUES FROM (%s) TO (%s);",
+            (month, next_month(month))
+        )
+        month = next_month(month)
+
+
+def list_partitions(cur) -> list[tuple[str, date]]:
+    """Return ``(partition, first day of its month)`` for every ``card_prices`` partition, oldest first."""
+    cur.execute("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'card_prices'::regclass;
+    """)
+    partitions = []
+    for (name,) in cur.fetchall():
+        match = re.fullmatch(r"card_prices_y(\d{4})m(\d{2})", name)
+        if match:
+            partitions.append((name, date(int(match[1]), int(match[2]), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+# --- Loading ---
+
+def load_prices(conn, json_file, price_type="retail", vendors=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Upsert every price point of an AllPrices-style file into ``card_prices``.
+
+    Runs in a single transaction.
+
+    Returns
+    -------
+    int
+        Number of price points read.
+    """
+    started = time.perf_counter()
+    columns = ", ".join(PRICE_COLUMNS)
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                CREATE TEMP TABLE card_prices_staging ON COMMIT DROP AS
+                SELECT {columns} FROM card_prices WITH NO DATA;
+            """)
+            writer = CopyWriter(cur, "card_prices_staging", PRICE_COLUMNS, batch_size)
+            for count, row in enumerate(iter_price_rows(json_file, price_type, vendors), 1):
+                writer.write_row(row)
+                if count % PROGRESS_EVERY == 0:
+                    print(f"{count} prices read ({time.perf_counter() - started:.1f}s)")
+            writer.flush()
+
+            cur.execute("SELECT min(price_date), max(price_date) FROM card_prices_staging;")
+            first, last = cur.fetchone()
+            if first is None:
+                print("No prices found.")
+                return 0
+            ensure_partitions(cur, first, last)
+            cur.execute(f"""
+                INSERT INTO card_prices ({columns})
+                SELECT {columns} FROM card_prices_staging
+                ON CONFLICT (uuid, vendor, finish, price_date)
+                DO UPDATE SET price = EXCLUDED.price, currency = EXCLUDED.currency;
+            """)
+            # Newest staged point per printing replaces the current price unless that is newer
+            cur.execute(f"""
+                INSERT INTO card_prices_current ({columns})
+                SELECT DISTINCT ON (uuid, vendor, finish) {columns}
+                FROM card_prices_staging
+                ORDER BY uuid, vendor, finish, price_date DESC
+                ON CONFLICT (uuid, vendor, finish) DO UPDATE
+                SET price_date = EXCLUDED.price_date, price = EXCLUDED.price, currency = EXCLUDED.currency
+                WHERE card_prices_current.price_date <= EXCLUDED.price_date;
+            """)
+    print(f"Imported {writer.written} prices in {time.perf_counter() - started:.1f}s.")
+    return writer.written
+
+
+# --- Retention ---
+
+def compact_prices(conn, keep_daily_days=None, retain_months=None) -> None:
+    """
+    Shrink old price history.
+
+    Parameters
+    ----------
+    conn : psycopg2 connection
+        Connection to run on; each step commits on its own.
+    keep_daily_days : int, optional
+        Points older than this many days are thinned to the last point of each week per
+        printing, vendor and finish (one partition at a time).
+    retain_months : int, optional
+        Partitions of months that ended more than this many months ago are dropped.
+    """
+    today = date.today()
+    with conn:
+        with conn.cursor() as cur:
+            partitions = list_partitions(cur)
+
+    if retain_months:
+        cutoff = today.replace(day=1)
+        for _ in range(retain_months):
+            cutoff = (cutoff - timedelta(days=1)).replace(day=1)
+        for name, month in partitions:
+            if month < cutoff:
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute(f"DROP TABLE {name};")
+                print(f"Dropped {name}")
+        partitions = [(name, month) for name, month in partitions if month >= cutoff]
+
+    if keep_daily_days:
+        cutoff = today - timedelta(days=keep_daily_days)
+        for name, month in partitions:
+            if month >= cutoff:
+                break
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute(f"""
+                        DELETE FROM {name}
+                        WHERE ctid IN (
+                            SELECT ctid FROM (
+                                SELECT ctid, row_number() OVER (
+                                    PARTITION BY uuid, vendor, finish, date_trunc('week', price_date)
+                                    ORDER BY price_date DESC
+                                ) AS newest
+                                FROM {name}
+                                WHERE price_date < %s
+                            ) points
+                            WHERE newest > 1
+                        );
+                    """, (cutoff,))
+                    print(f"Thinned {name}: {cur.rowcount} points removed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load MTGJSON AllPrices.json into the card_prices table.")
+    parser.add_argument("json_file", nargs="?", help="Path to AllPrices.json or AllPricesToday.json")
+    parser.add_argument("--price-type", default="retail", choices=("retail", "buylist"))
+    parser.add_argument("--vendors", help="Comma-separated vendors to load (default: all)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per COPY statement")
+    parser.add_argument("--keep-daily-days", type=int,
+                        help="Thin prices older than this many days to one point per week")
+    parser.add_argument("--retain-months", type=int, help="Drop price history older than this many months")
+    parser.add_argument("--dbname", default="mtgbase")
+    parser.add_argument("--user", default="postgres")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", default="5432")
+    args = parser.parse_args()
+
+    password = os.environ.get("DB_PASSWORD")
+    if not password:
+        # Fail fast with a clear error message
+        raise ValueError(
+            "No database password supplied. Please set the DB_PASSWORD environment variable:\n"
+            "Windows: set DB_PASSWORD=your_password\n"
+            "Linux/Mac: export DB_PASSWORD=your_password")
+
+    vendors = {vendor.strip() for vendor in args.vendors.split(",")} if args.vendors else None
+    conn = psycopg2.connect(dbname=args.dbname, user=args.user, password=password,
+                            host=args.host, port=args.port)
+    try:
+        if args.json_file:
+            meta = read_meta(args.json_file)
+            print(f"AllPrices {meta.get('version', '?')} ({meta.get('date', '?')})")
+            load_prices(conn, args.json_file, args.price_type, vendors, args.batch_size)
+        if args.keep_daily_days or args.retain_months:
+            compact_prices(conn, args.keep_daily_days, args.retain_months)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
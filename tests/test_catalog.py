@@ -0,0 +1,19 @@
+from catalog import CardCatalog
+
+
+def test_reload_publishes_a_new_consistent_snapshot():
+    loads = iter([
+        [{"name": "Opt", "uuid": "u1"}],
+        [{"name": "Opt", "uuid": "u2"}, {"name": "Shock", "uuid": "u3"}],
+    ])
+    catalog = CardCatalog(lambda: next(loads), ttl=0)
+
+    first = catalog.snapshot()
+    assert first.version == 1 and first.by_name["Opt"]["uuid"] == "u1"
+
+    assert catalog.refresh() == 2
+    second = catalog.snapshot()
+    assert second.by_name["Opt"] is second.by_uuid["u2"]
+    assert "u1" not in second.by_uuid and catalog.get_by_uuid("u1") is None
+    # A snapshot taken before the reload still describes the old load only
+    assert first.version == 1 and list(first.by_uuid) == ["u1"]
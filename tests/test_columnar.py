@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from columnar import ColumnarCatalog, similarity
+from filters import CardFilter
+
+
+def card(name, text="", types="Creature", subtypes="", manavalue=0, cost=0, identity=0):
+    return {"name": name, "text": text, "types": types, "subtypes": subtypes, "manavalue": manavalue,
+            "mana_cost_mask": cost, "color_identity_mask": identity}
+
+
+CARDS = sorted([
+    card("Llanowar Elves", "{T}: Add {G}.", subtypes="Elf, Druid", manavalue=1, cost=16, identity=16),
+    card("Elvish Mystic", "{T}: Add {G}.", subtypes="Elf, Druid", manavalue=1, cost=16, identity=16),
+    card("Divination", "Draw two cards.", types="Sorcery", manavalue=3, cost=2, identity=2),
+    card("Sol Ring", "{T}: Add {C}{C}.", types="Artifact", manavalue=1),
+    card("Elspeth, Sun's Champion", "+1: Create three 1/1 white Soldier creature tokens.",
+         types="Planeswalker", manavalue=6, cost=1, identity=1),
+], key=lambda c: c["name"])
+
+
+def names(catalog, card_filter, **kwargs):
+    return [c["name"] for c in catalog.search(card_filter, **kwargs)[1]]
+
+
+def test_similarity_matches_pg_trgm():
+    # Example from the pg_trgm documentation
+    assert similarity("word", "two words") == pytest.approx(4 / 11)
+    assert similarity("", "") == 0.0
+
+
+def test_filters():
+    catalog = ColumnarCatalog(CARDS)
+    assert names(catalog, CardFilter(subtype="elf")) == ["Elvish Mystic", "Llanowar Elves"]
+    assert names(catalog, CardFilter(type="artifact")) == ["Sol Ring"]
+    assert names(catalog, CardFilter(identity_colors=frozenset("U"))) == ["Divination", "Sol Ring"]
+    assert names(catalog, CardFilter(allowed_colors=frozenset("W"))) == ["Elspeth, Sun's Champion", "Sol Ring"]
+    assert names(catalog, CardFilter(mana_min=2, mana_max=5)) == ["Divination"]
+
+
+def test_text_matches_every_word():
+    catalog = ColumnarCatalog(CARDS)
+    assert names(catalog, CardFilter(text="Draw two")) == ["Divination"]
+    assert names(catalog, CardFilter(text="cards draw")) == ["Divination"]
+    assert names(catalog, CardFilter(text="draw three")) == []
+
+
+def test_name_search_is_ordered_by_similarity_then_name():
+    catalog = ColumnarCatalog(CARDS)
+    assert names(catalog, CardFilter(name="el")) == [
+        "Elvish Mystic", "Llanowar Elves", "Elspeth, Sun's Champion"]
+    total, page = catalog.search(CardFilter(name="el"), limit=1, offset=1)
+    assert total == 3 and [c["name"] for c in page] == ["Llanowar Elves"]
+    # Without a name to rank by, matches keep the catalog's name order
+    assert names(catalog, CardFilter(text="add")) == ["Elvish Mystic", "Llanowar Elves", "Sol Ring"]
@@ -0,0 +1,16 @@
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from dbmanager import AsyncDBManager
+
+
+def test_close_does_not_create_the_database():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        raise AssertionError("factory called on close")
+
+    AsyncDBManager(factory, max_workers=1).close()
+    assert calls == []
@@ -0,0 +1,85 @@
+import os
+import uuid
+
+import pytest
+
+from decks import JsonDeckStore
+
+# The Postgres store runs against a database created with database/create_tables.sql,
+# named by TEST_DB_NAME (with DB_PASSWORD); without it only the JSON store is tested
+TEST_DB_NAME = os.environ.get("TEST_DB_NAME")
+
+
+@pytest.fixture(params=["json", "postgres"])
+def store(request, tmp_path):
+    if request.param == "json":
+        yield JsonDeckStore(tmp_path, flush_delay=0)
+        return
+    if not TEST_DB_NAME:
+        pytest.skip("TEST_DB_NAME not set")
+    pytest.importorskip("psycopg2")
+    from dbmanager import DBManager
+    from decks import PostgresDeckStore
+    db = DBManager(dbname=TEST_DB_NAME, user=os.environ.get("DB_USER", "postgres"),
+                   password=os.environ.get("DB_PASSWORD"), host=os.environ.get("DB_HOST", "localhost"))
+    yield PostgresDeckStore(db)
+    db.close()
+
+
+@pytest.fixture
+def username(store):
+    name = f"test-{uuid.uuid4().hex}"
+    yield name
+    store.save_decks(name, {})
+
+
+def contents(store, username):
+    """Decks without timestamps; commander order is not part of the contract."""
+    return {name: {"cards": dict(deck["cards"]), "commander": sorted(deck["commander"]),
+                   "favorite": deck["favorite"]}
+            for name, deck in store.load_decks(username).items()}
+
+
+def test_edits(store, username):
+    store.create_deck(username, "deck")
+    store.create_deck(username, "deck")
+    store.add_card(username, "deck", "a")
+    store.add_card(username, "deck", "a", quantity=2)
+    store.add_card(username, "deck", "b")
+    store.set_favorite(username, "deck", True)
+    store.add_card(username, "missing", "a")
+    assert contents(store, username) == {"deck": {"cards": {"a": 3, "b": 1}, "commander": [], "favorite": True}}
+
+    assert store.remove_card(username, "deck", "b")
+    assert not store.remove_card(username, "deck", "b")
+    store.delete_deck(username, "deck")
+    assert contents(store, username) == {}
+
+
+def test_commander_and_main_deck_copies_are_kept_apart(store, username):
+    store.create_deck(username, "deck")
+    store.add_card(username, "deck", "a", quantity=2)
+    store.add_commander(username, "deck", "a")
+    store.add_commander(username, "deck", "a")
+    store.add_commander(username, "deck", "b")
+    store.add_card(username, "deck", "b")
+    assert contents(store, username) == {
+        "deck": {"cards": {"a": 2, "b": 1}, "commander": ["a", "b"], "favorite": False}}
+
+    # Removing a card removes it from the main deck and the command zone
+    assert store.remove_card(username, "deck", "a")
+    assert contents(store, username)["deck"] == {"cards": {"b": 1}, "commander": ["b"], "favorite": False}
+
+
+def test_save_decks_round_trip(store, username):
+    decks = {
+        "new": {"cards": {"a": 2}, "commander": ["a"], "updated_at": "2024-01-02T03:04:05", "favorite": True},
+        # Legacy layout: a card record per copy, a single commander record
+        "old": {"cards": [{"uuid": "c", "name": "C"}, {"uuid": "c", "name": "C"}],
+                "commander": {"uuid": "d", "name": "D"}, "updated_at": "2024-01-02T03:04:05"},
+    }
+    store.save_decks(username, decks)
+    assert contents(store, username) == {
+        "new": {"cards": {"a": 2}, "commander": ["a"], "favorite": True},
+        "old": {"cards": {"c": 2}, "commander": ["d"], "favorite": False},
+    }
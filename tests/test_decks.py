@@ -0,0 +1,61 @@
+import errno
+import json
+import threading
+import time
+
+from decks import JsonDeckStore
+
+
+def fail_writes(store, count):
+    """Make the next ``count`` writes of a store fail as on a full disk."""
+    write = store._write
+    remaining = [count]
+
+    def failing_write(username, payload):
+        if remaining[0] > 0:
+            remaining[0] -= 1
+            time.sleep(0.01)  # hold the write lock a little while, like a slow disk
+            raise OSError(errno.ENOSPC, "No space left on device")
+        write(username, payload)
+
+    store._write = failing_write
+
+
+def test_failed_write_does_not_block_concurrent_edits(tmp_path):
+    store = JsonDeckStore(tmp_path, flush_delay=0)
+    store.RETRY_DELAY = 0.01
+    store.create_deck("alice", "deck")
+    fail_writes(store, 30)
+
+    def edit(offset):
+        for n in range(20):
+            store.add_card("alice", "deck", f"uuid-{offset + n}")
+
+    def flush():
+        for _ in range(20):
+            store.flush()
+
+    threads = [threading.Thread(target=edit, args=(0,), daemon=True),
+               threading.Thread(target=edit, args=(100,), daemon=True),
+               threading.Thread(target=flush, daemon=True)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert not any(thread.is_alive() for thread in threads), "deck store deadlocked"
+
+    store.flush()
+    saved = json.loads((tmp_path / "alice.json").read_text())
+    assert saved == dict(store.load_decks("alice"))
+    assert len(saved["deck"]["cards"]) == 40
+
+
+def test_failed_write_is_retried_without_another_edit(tmp_path):
+    store = JsonDeckStore(tmp_path, flush_delay=0.05)
+    fail_writes(store, 1)
+    store.create_deck("bob", "deck")
+
+    deadline = time.monotonic() + 5
+    while not (tmp_path / "bob.json").exists() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert json.loads((tmp_path / "bob.json").read_text())["deck"]["cards"] == {}